@@ -7,6 +7,8 @@ from flask_sqlalchemy import SQLAlchemy
 from app.config import config
 from flask_hashids import Hashids
 from app import blueprints
+from app.json_provider import OrjsonProvider, ORJSON_AVAILABLE
+from app.hashid_converter import HashidConverterCacheado
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -21,17 +23,31 @@ def create_app() -> Flask:
     app_context = os.getenv('FLASK_CONTEXT')
     # https://flask.palletsprojects.com/en/stable/api/#flask.Flask
     app = Flask(__name__)
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
     f = config.factory(app_context if app_context else 'development')
     app.config.from_object(f)
     db.init_app(app)
     migrate.init_app(app, db)
     hashids.init_app(app)
+    app.url_map.converters['hashid'] = HashidConverterCacheado
     ma.init_app(app)
 
     blueprints.registrar_blueprints(app)
+
+    from app.repositories.uow import registrar_unit_of_work
+    registrar_unit_of_work(app)
+
+    from app.errores import registrar_manejadores_error
+    registrar_manejadores_error(app)
+
+    from app.comandos import registrar_comandos
+    registrar_comandos(app)
     
+    from app.repositories.uow import unit_of_work
+
     @app.shell_context_processor
     def ctx():
-        return {"app": app}
+        return {"app": app, "db": db, "unit_of_work": unit_of_work}
 
     return app
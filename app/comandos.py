@@ -0,0 +1,18 @@
+"""
+Comandos de consola de la aplicación (`flask <comando>`).
+Corren fuera de una petición: confirman sus cambios con unit_of_work().
+"""
+import click
+from flask import Flask
+
+
+def registrar_comandos(app: Flask):
+
+    @app.cli.command('copiar-datos-facultad')
+    def copiar_datos_facultad():
+        """Completa en las especialidades los datos copiados de su facultad y universidad."""
+        from app.repositories.uow import unit_of_work
+        from app.services import EspecialidadService
+        with unit_of_work():
+            actualizadas = EspecialidadService.copiar_datos_facultad()
+        click.echo(f"Especialidades actualizadas: {actualizadas}")
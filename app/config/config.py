@@ -6,6 +6,31 @@ import os
 basedir = os.path.abspath(Path(__file__).parents[2])
 load_dotenv(os.path.join(basedir, '.env'))
 
+def engine_options(uri: str) -> dict:
+    """
+    Opciones del engine de SQLAlchemy según el driver de la URI.
+    - PostgreSQL: pool LIFO (reutiliza la conexión más reciente y deja que las
+      de overflow expiren), pre-ping y reciclado de conexiones.
+    - psycopg2: los executemany usan execute_values/execute_batch,
+      agrupando muchas filas por sentencia en lugar de una por fila.
+    """
+    if not uri or not uri.startswith('postgresql'):
+        return {}
+    options = {
+        'pool_size': 20,
+        'max_overflow': 30,
+        'pool_use_lifo': True,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+    if uri.startswith(('postgresql://', 'postgresql+psycopg2://')):
+        options.update({
+            'executemany_mode': 'values_plus_batch',
+            'insertmanyvalues_page_size': 1000,
+            'executemany_batch_page_size': 500,
+        })
+    return options
+
 class Config(object):
     TESTING = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -24,18 +49,21 @@ class TestConfig(Config):
     DEBUG = True
     SQLALCHEMY_TRACK_MODIFICATIONS = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URI')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     
 class DevelopmentConfig(Config):
     TESTING = True
     DEBUG = True
     SQLALCHEMY_TRACK_MODIFICATIONS = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URI')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
         
 class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     SQLALCHEMY_RECORD_QUERIES = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('PROD_DATABASE_URI')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     
     @classmethod
     def init_app(cls, app):
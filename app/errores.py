@@ -0,0 +1,43 @@
+"""
+Manejadores de errores globales: convierten las excepciones que escapan de
+los resources en respuestas JSON, así cada endpoint queda sin try/except.
+"""
+from flask import Flask, jsonify
+from marshmallow import ValidationError
+from werkzeug.exceptions import HTTPException
+
+
+class DatosInvalidos(ValueError):
+    """Datos enviados por el cliente que no se pueden procesar: se responde 400."""
+
+
+def registrar_manejadores_error(app: Flask):
+    """
+    ValidationError (marshmallow) y DatosInvalidos -> 400 con el detalle.
+    Errores HTTP (404 de rutas, 405, abort(), etc.) -> su código y descripción.
+    Cualquier otra excepción (incluido un ValueError no previsto) es un error
+    del servidor: se registra en el log y el cliente solo recibe un 500 genérico.
+    """
+
+    @app.errorhandler(HTTPException)
+    def error_http(e: HTTPException):
+        if e.response is not None:
+            return e.response
+        # Se parte de la respuesta de werkzeug para conservar sus headers (Allow, etc.)
+        respuesta = e.get_response()
+        respuesta.set_data(app.json.dumps({"error": e.description}))
+        respuesta.content_type = 'application/json'
+        return respuesta
+
+    @app.errorhandler(ValidationError)
+    def error_validacion(e: ValidationError):
+        return jsonify({"error": e.messages}), 400
+
+    @app.errorhandler(DatosInvalidos)
+    def error_datos(e: DatosInvalidos):
+        return jsonify({"error": str(e)}), 400
+
+    @app.errorhandler(Exception)
+    def error_interno(e: Exception):
+        app.logger.exception(e)
+        return jsonify({"error": "Error interno"}), 500
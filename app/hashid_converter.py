@@ -0,0 +1,16 @@
+"""
+Conversor de rutas <hashid:...> con memoria de los hashids ya decodificados.
+Decodificar un hashid es trabajo en Python puro que se repite en cada petición
+a la misma URL; el resultado solo depende de la configuración de la app.
+"""
+from functools import lru_cache
+from flask_hashids import HashidConverter
+
+
+class HashidConverterCacheado(HashidConverter):
+    """HashidConverter de flask_hashids con to_python memoizado (por regla de URL)."""
+
+    def __init__(self, map, *args, **kwargs):
+        super().__init__(map, *args, **kwargs)
+        # Los hashids inválidos lanzan ValidationError y no se guardan
+        self.to_python = lru_cache(maxsize=4096)(super().to_python)
@@ -0,0 +1,65 @@
+"""
+Proveedor JSON de Flask basado en orjson (serialización implementada en C).
+Lo usan jsonify() y las respuestas que retornan dict/list desde los resources.
+Si orjson no está instalado se mantiene el proveedor por defecto de Flask.
+"""
+import dataclasses
+import typing as t
+from functools import lru_cache
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def _campos(cls: type) -> tuple[str, ...]:
+    return tuple(f.name for f in dataclasses.fields(cls))
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Mismo comportamiento que DefaultJSONProvider (fechas, UUID, dataclasses,
+    claves ordenadas) pero serializando con orjson.
+
+    orjson escribe los campos de una dataclass en el orden de declaración y
+    OPT_SORT_KEYS solo ordena claves de dicts: con sort_keys las dataclasses
+    pasan por `default`, que las convierte en dict de a un nivel, para que la
+    salida sea la misma que con el proveedor de Flask. Sin sort_keys orjson
+    las serializa directamente.
+    """
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        if kwargs or indent not in (None, 2):
+            # Opciones propias de json.dumps que orjson no soporta
+            if indent is not None:
+                kwargs['indent'] = indent
+            return super().dumps(obj, **kwargs)
+
+        # Las fechas pasan por `default` para conservar el formato de Flask
+        opciones = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        default = self.default
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+            default = self._default_ordenado
+        if indent:
+            opciones |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=opciones).decode()
+
+    def _default_ordenado(self, o: t.Any) -> t.Any:
+        # Un nivel por llamada (sin la copia profunda de asdict): las dataclasses
+        # anidadas vuelven a pasar por aquí y orjson ordena las claves de cada dict
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return {campo: getattr(o, campo) for campo in _campos(type(o))}
+        return self.default(o)
+
+    def loads(self, s: t.Union[str, bytes], **kwargs: t.Any) -> t.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
@@ -0,0 +1,99 @@
+"""
+Estructuras de respuesta del endpoint GET /especialidad/<id>/alumnos.
+Hay dos formas para los alumnos: por filas (una lista de objetos, la forma
+por defecto) y por columnas (?format=columnar: un objeto con una lista por
+campo, sin repetir los nombres de campo en cada alumno).
+Son dataclasses inmutables con slots: se construyen sin dicts intermedios y
+pueden compartirse desde la cache. Al serializarlas a JSON las claves salen
+ordenadas, con orjson o sin él (ver app/json_provider.py).
+"""
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class AlumnoRespuesta:
+    id: int
+    hashid: str
+    nombre: str
+    apellido: str
+    nrodocumento: str
+    nro_legajo: int
+    sexo: str
+    fecha_nacimiento: str
+    fecha_ingreso: str
+
+
+@dataclass(frozen=True, slots=True)
+class UniversidadRespuesta:
+    id: int
+    hashid: str
+    nombre: str
+    sigla: str
+
+
+@dataclass(frozen=True, slots=True)
+class FacultadRespuesta:
+    id: int
+    hashid: str
+    nombre: str
+    abreviatura: str
+    sigla: str
+    universidad: UniversidadRespuesta
+
+
+@dataclass(frozen=True, slots=True)
+class EspecialidadRespuesta:
+    id: int
+    hashid: str
+    nombre: str
+    letra: str
+    observacion: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class AlumnosPorEspecialidadRespuesta:
+    especialidad: EspecialidadRespuesta
+    facultad: FacultadRespuesta
+    alumnos: tuple[AlumnoRespuesta, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class AlumnosColumnas:
+    """Los mismos campos que AlumnoRespuesta, cada uno con los valores de todos los alumnos."""
+    id: tuple[int, ...]
+    hashid: tuple[str, ...]
+    nombre: tuple[str, ...]
+    apellido: tuple[str, ...]
+    nrodocumento: tuple[str, ...]
+    nro_legajo: tuple[int, ...]
+    sexo: tuple[str, ...]
+    fecha_nacimiento: tuple[str, ...]
+    fecha_ingreso: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class AlumnosPorEspecialidadColumnarRespuesta:
+    especialidad: EspecialidadRespuesta
+    facultad: FacultadRespuesta
+    alumnos: AlumnosColumnas
+
+
+# Claves y lectores precalculados por clase para los serializadores que no
+# soportan dataclasses (msgpack): evita asdict, que copia todo en profundidad
+_LECTORES = {
+    cls: (claves, attrgetter(*claves))
+    for cls in (AlumnoRespuesta, UniversidadRespuesta, FacultadRespuesta, EspecialidadRespuesta,
+                AlumnosPorEspecialidadRespuesta, AlumnosColumnas, AlumnosPorEspecialidadColumnarRespuesta)
+    for claves in [tuple(f.name for f in fields(cls))]
+}
+
+
+def como_dict(obj: Any) -> dict:
+    """Hook `default` de serialización: convierte un nivel de la estructura en dict."""
+    try:
+        claves, leer = _LECTORES[type(obj)]
+    except KeyError:
+        raise TypeError(f"Tipo no serializable: {type(obj).__name__}") from None
+    return dict(zip(claves, leer(obj)))
@@ -14,4 +14,5 @@ from .grupo import Grupo
 from .cargo import Cargo
 from .orientacion import Orientacion
 from .autoridad import Autoridad
-from .facultad import Facultad
\ No newline at end of file
+from .facultad import Facultad
+from . import especialidad_snapshot
@@ -8,6 +8,13 @@ from flask_hashids import HashidMixin
 @dataclass(init=False, repr=True, eq=True)
 class Alumno(HashidMixin,db.Model):
     __tablename__ = 'alumnos'
+    # Cubre el listado de alumnos por especialidad: en PostgreSQL la consulta
+    # se responde solo desde el índice (INCLUDE), sin leer la tabla
+    __table_args__ = (
+        db.Index('ix_alumnos_especialidad_id', 'especialidad_id',
+                 postgresql_include=['id', 'nombre', 'apellido', 'nrodocumento', 'nro_legajo',
+                                     'sexo', 'fecha_nacimiento', 'fecha_ingreso']),
+    )
     id:int = db.Column(db.Integer, primary_key=True,autoincrement=True)
     nombre:str = db.Column(db.String(50), nullable=False) 
     apellido:str = db.Column(db.String(50), nullable=False)
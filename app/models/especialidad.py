@@ -16,4 +16,14 @@ class Especialidad(HashidMixin,db.Model):
 
     facultad_id: int = db.Column(db.Integer, db.ForeignKey('facultades.id'), nullable=False)
     facultad = db.relationship('Facultad', lazy=True)
+
+    # Copia de datos de la facultad y su universidad para leer la especialidad
+    # sin JOINs; la mantienen los eventos de app/models/especialidad_snapshot.py
+    facultad_nombre: str = db.Column(db.String(100), nullable=True)
+    facultad_abreviatura: str = db.Column(db.String(10), nullable=True)
+    facultad_sigla: str = db.Column(db.String(10), nullable=True)
+    universidad_id: int = db.Column(db.Integer, nullable=True)
+    universidad_nombre: str = db.Column(db.String(100), nullable=True)
+    universidad_sigla: str = db.Column(db.String(10), nullable=True)
+
     #TODO especialidad muchos a uno con facultad
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Mantiene las columnas copiadas de Facultad y Universidad en Especialidad
+(facultad_nombre, universidad_sigla, etc.), que permiten leer una especialidad
+con los datos de su facultad sin JOINs.
+
+- Al crear una especialidad o cambiarle la facultad se copian los datos.
+- Al modificar una facultad o una universidad se actualizan sus especialidades.
+
+Las inserciones y UPDATE masivos (bulk_save_objects, COPY, query.update) no
+emiten estos eventos: esas filas quedan sin copia hasta correr
+`flask copiar-datos-facultad`, y mientras tanto la lectura de la especialidad
+vuelve a hacer los JOINs (ver EspecialidadRepository).
+"""
+from sqlalchemy import event, inspect, select, update
+from app.models.especialidad import Especialidad
+from app.models.facultad import Facultad
+from app.models.universidad import Universidad
+
+_CAMPOS_FACULTAD = ('nombre', 'abreviatura', 'sigla', 'universidad_id')
+_CAMPOS_UNIVERSIDAD = ('nombre', 'sigla')
+
+
+def _datos_facultad(connection, facultad_id: int) -> dict:
+    fila = connection.execute(
+        select(Facultad.nombre.label('facultad_nombre'),
+               Facultad.abreviatura.label('facultad_abreviatura'),
+               Facultad.sigla.label('facultad_sigla'),
+               Universidad.id.label('universidad_id'),
+               Universidad.nombre.label('universidad_nombre'),
+               Universidad.sigla.label('universidad_sigla'))
+        .join(Universidad, Facultad.universidad_id == Universidad.id)
+        .where(Facultad.id == facultad_id)
+    ).one_or_none()
+    return dict(fila._mapping) if fila else {}
+
+
+def _copiar_datos_facultad(connection, especialidad: Especialidad):
+    for campo, valor in _datos_facultad(connection, especialidad.facultad_id).items():
+        setattr(especialidad, campo, valor)
+
+
+def _cambio(entity, campos) -> bool:
+    estado = inspect(entity)
+    return any(estado.attrs[campo].history.has_changes() for campo in campos)
+
+
+@event.listens_for(Especialidad, 'before_insert')
+def _especialidad_creada(mapper, connection, especialidad):
+    _copiar_datos_facultad(connection, especialidad)
+
+
+@event.listens_for(Especialidad, 'before_update')
+def _especialidad_modificada(mapper, connection, especialidad):
+    if _cambio(especialidad, ('facultad_id',)):
+        _copiar_datos_facultad(connection, especialidad)
+
+
+@event.listens_for(Facultad, 'after_update')
+def _facultad_modificada(mapper, connection, facultad):
+    if _cambio(facultad, _CAMPOS_FACULTAD):
+        connection.execute(
+            update(Especialidad)
+            .where(Especialidad.facultad_id == facultad.id)
+            .values(**_datos_facultad(connection, facultad.id))
+        )
+
+
+@event.listens_for(Universidad, 'after_update')
+def _universidad_modificada(mapper, connection, universidad):
+    if _cambio(universidad, _CAMPOS_UNIVERSIDAD):
+        connection.execute(
+            update(Especialidad)
+            .where(Especialidad.universidad_id == universidad.id)
+            .values(universidad_nombre=universidad.nombre, universidad_sigla=universidad.sigla)
+        )
@@ -1,4 +1,7 @@
-from app.models import Alumno
+from typing import List
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Alumno, Especialidad, Facultad
 from app.repositories.base_repository import BaseRepository
 
 
@@ -8,3 +11,32 @@ class AlumnoRepository(BaseRepository[Alumno]):
     Hereda operaciones CRUD de BaseRepository.
     """
     model = Alumno
+
+    # Todo lo que recorre la plantilla del certificado, incluido
+    # alumno.tipo_documento.sigla, se trae en el mismo JOIN
+    _JERARQUIA = (joinedload(Alumno.tipo_documento),
+                  joinedload(Alumno.especialidad)
+                  .joinedload(Especialidad.facultad)
+                  .joinedload(Facultad.universidad))
+
+    @classmethod
+    def buscar_por_id_con_jerarquia(cls, id: int) -> Alumno:
+        """
+        Busca un alumno junto con su tipo de documento, especialidad, facultad
+        y universidad en una sola consulta (JOIN), evitando las cargas perezosas posteriores.
+        """
+        return (db.session.query(Alumno)
+                .options(*cls._JERARQUIA)
+                .filter(Alumno.id == id)
+                .first())
+
+    @classmethod
+    def buscar_por_especialidad_con_jerarquia(cls, especialidad_id: int) -> List[Alumno]:
+        """
+        Busca los alumnos de una especialidad junto con su tipo de documento,
+        especialidad, facultad y universidad en una sola consulta.
+        """
+        return (db.session.query(Alumno)
+                .options(*cls._JERARQUIA)
+                .filter(Alumno.especialidad_id == especialidad_id)
+                .all())
@@ -1,12 +1,27 @@
 """
 Repositorio base genérico para operaciones CRUD.
 Implementa el principio DRY eliminando código duplicado en todos los repositorios.
+
+Los métodos de escritura solo hacen flush: la confirmación la realiza la
+unidad de trabajo (ver app/repositories/uow.py).
+
+Las consultas por ID usan lambda_stmt: la sentencia se construye y compila
+una sola vez por modelo y en cada llamada solo cambian los parámetros.
 """
-from typing import TypeVar, Generic, Type, List, Optional
+import csv
+import datetime
+from collections import defaultdict
+from typing import TypeVar, Generic, Type, List, Optional, Iterator, TextIO
+from sqlalchemy import delete, inspect, lambda_stmt, select
+from sqlalchemy.orm import MANYTOONE, make_transient_to_detached
 from app import db
+from app.errores import DatosInvalidos
 
 T = TypeVar('T')
 
+# Caracteres que se leen del CSV por cada escritura al COPY de psycopg 3
+_BLOQUE_COPY = 64 * 1024
+
 
 class BaseRepository(Generic[T]):
     """
@@ -23,35 +38,194 @@ class BaseRepository(Generic[T]):
     def crear(cls, entity: T) -> T:
         """Crea una nueva entidad en la base de datos."""
         db.session.add(entity)
-        db.session.commit()
+        db.session.flush()
         return entity
     
+    @classmethod
+    def crear_muchos(cls, entities: List[T], batch_size: int = 1000) -> List[T]:
+        """
+        Crea varias entidades en lotes.
+        Usa bulk_save_objects: solo se persisten columnas (las relaciones
+        deben venir resueltas como FKs, p. ej. especialidad_id).
+        """
+        for i in range(0, len(entities), batch_size):
+            db.session.bulk_save_objects(entities[i:i + batch_size])
+        db.session.flush()
+        return entities
+    
+    @classmethod
+    def crear_muchos_mappings(cls, mappings: List[dict], batch_size: int = 1000) -> int:
+        """
+        Inserta filas a partir de diccionarios sin construir entidades (ETL).
+        Retorna la cantidad de filas insertadas.
+        """
+        for i in range(0, len(mappings), batch_size):
+            db.session.bulk_insert_mappings(cls.model, mappings[i:i + batch_size])
+        db.session.flush()
+        return len(mappings)
+    
+    @classmethod
+    def copiar_desde_csv(cls, stream: TextIO, batch_size: int = 1000) -> int:
+        """
+        Importa filas desde un CSV cuya primera línea nombra las columnas.
+        En PostgreSQL (psycopg2 o psycopg 3) el resto del stream va directo a
+        COPY ... FROM STDIN (sin objetos Python por fila); con otros motores o
+        drivers se inserta por lotes con bulk_insert_mappings.
+        Retorna la cantidad de filas insertadas. Lanza DatosInvalidos si el
+        encabezado nombra columnas inexistentes o un valor no se puede convertir.
+        """
+        tabla = cls.model.__table__
+        columnas = next(csv.reader([stream.readline()]), [])
+        desconocidas = [c for c in columnas if c not in tabla.columns]
+        if not columnas or desconocidas:
+            raise DatosInvalidos(f"Columnas inválidas para {tabla.name}: {desconocidas or 'encabezado vacío'}")
+        
+        conexion = db.session.connection()
+        driver = conexion.dialect.driver if conexion.dialect.name == 'postgresql' else None
+        if driver in ('psycopg2', 'psycopg'):
+            preparador = conexion.dialect.identifier_preparer
+            sentencia = "COPY {} ({}) FROM STDIN WITH CSV".format(
+                preparador.format_table(tabla),
+                ', '.join(preparador.quote(c) for c in columnas)
+            )
+            with conexion.connection.cursor() as cursor:
+                if driver == 'psycopg2':
+                    cursor.copy_expert(sentencia, stream)
+                else:
+                    # psycopg 3 no tiene copy_expert: se escribe al COPY por bloques
+                    with cursor.copy(sentencia) as copia:
+                        while bloque := stream.read(_BLOQUE_COPY):
+                            copia.write(bloque)
+                return cursor.rowcount
+        
+        conversores = [_conversor(tabla.columns[c]) for c in columnas]
+        total = 0
+        lote = []
+        for numero, fila in enumerate(csv.reader(stream), start=2):
+            try:
+                lote.append({c: conv(v) for c, conv, v in zip(columnas, conversores, fila)})
+            except ValueError as e:
+                raise DatosInvalidos(f"Línea {numero}: {e}") from e
+            if len(lote) >= batch_size:
+                total += cls.crear_muchos_mappings(lote, batch_size)
+                lote = []
+        if lote:
+            total += cls.crear_muchos_mappings(lote, batch_size)
+        return total
+    
     @classmethod
     def buscar_por_id(cls, id: int) -> Optional[T]:
         """Busca una entidad por su ID."""
-        return db.session.query(cls.model).filter_by(id=id).first()
+        model = cls.model
+        stmt = lambda_stmt(lambda: select(model))
+        stmt += lambda s: s.where(model.id == id)
+        return db.session.execute(stmt).scalar_one_or_none()
     
     @classmethod
     def buscar_todos(cls) -> List[T]:
         """Retorna todas las entidades."""
-        return db.session.query(cls.model).all()
+        model = cls.model
+        return db.session.execute(lambda_stmt(lambda: select(model))).scalars().all()
+    
+    @classmethod
+    def iter_todos(cls, chunk: int = 1000) -> Iterator[T]:
+        """Itera todas las entidades trayéndolas de a `chunk` filas (memoria constante)."""
+        return iter(db.session.query(cls.model).yield_per(chunk))
+    
+    @classmethod
+    def a_valores(cls, entities: List[T]) -> List[dict]:
+        """Extrae los valores de columna de las entidades (p. ej. para cachearlas)."""
+        claves = [attr.key for attr in inspect(cls.model).column_attrs]
+        return [{clave: getattr(entity, clave) for clave in claves} for entity in entities]
+    
+    @classmethod
+    def desde_valores(cls, filas: List[dict]) -> List[T]:
+        """
+        Reconstruye entidades persistentes a partir de valores de columna,
+        asociándolas a la sesión actual sin consultar la base de datos.
+        Las que ya están en la sesión se retornan tal cual: sus valores pueden
+        ser más nuevos que los guardados y no se pisan.
+        """
+        session = db.session
+        entities = []
+        for valores in filas:
+            entity = cls.model(**valores)
+            make_transient_to_detached(entity)
+            existente = session.identity_map.get(inspect(entity).key)
+            entities.append(existente if existente is not None else session.merge(entity, load=False))
+        return entities
+    
+    @classmethod
+    def resolver_referencias(cls, entity: T) -> T:
+        """
+        Completa las relaciones muchos-a-uno de `entity` que solo traen la FK
+        (p. ej. especialidad_id sin especialidad, como las arma el mapping).
+        Hace una consulta IN por modelo referenciado y solo para los IDs que
+        no están ya en el identity map; luego asigna sin más consultas.
+        """
+        mapper = inspect(cls.model)
+        valores = entity.__dict__
+        referencias = []
+        # El identity map guarda referencias débiles: se retienen los objetos
+        # encontrados o cargados para que no se descarten antes de asignarlos
+        cargados = {}
+        faltantes = defaultdict(set)
+        for rel in mapper.relationships:
+            if rel.direction is not MANYTOONE or rel.secondary is not None or len(rel.local_columns) != 1:
+                continue
+            if valores.get(rel.key) is not None:
+                continue
+            fk = mapper.get_property_by_column(next(iter(rel.local_columns))).key
+            if valores.get(fk) is None:
+                continue
+            clave = rel.mapper.identity_key_from_primary_key((valores[fk],))
+            referencias.append((rel.key, clave))
+            existente = db.session.identity_map.get(clave)
+            if existente is not None:
+                cargados[clave] = existente
+            else:
+                faltantes[rel.mapper].add(valores[fk])
+        
+        for destino, ids in faltantes.items():
+            for obj in db.session.query(destino).filter(destino.primary_key[0].in_(ids)):
+                cargados[inspect(obj).identity_key] = obj
+        
+        for atributo, clave in referencias:
+            referencia = cargados.get(clave)
+            if referencia is not None:
+                setattr(entity, atributo, referencia)
+        return entity
     
     @classmethod
     def actualizar(cls, entity: T) -> T:
-        """Actualiza una entidad existente."""
-        db.session.merge(entity)
-        db.session.commit()
+        """
+        Actualiza una entidad existente.
+        La entidad ya está en la sesión (viene de buscar_por_id), por lo que
+        alcanza con un flush; merge() haría un SELECT adicional.
+        """
+        db.session.flush()
         return entity
     
     @classmethod
     def borrar_por_id(cls, id: int) -> bool:
-        """Elimina una entidad por su ID."""
-        entity = cls.buscar_por_id(id)
-        if not entity:
-            return False
-        db.session.delete(entity)
-        db.session.commit()
-        return True
+        """
+        Elimina una entidad por su ID con un único DELETE, sin cargarla.
+        No aplica cascadas del ORM (para eso usar borrar()).
+        """
+        model = cls.model
+        stmt = lambda_stmt(lambda: delete(model))
+        stmt += lambda s: s.where(model.id == id)
+        return db.session.execute(stmt).rowcount > 0
+    
+    @classmethod
+    def borrar_muchos_por_id(cls, ids: List[int]) -> int:
+        """Elimina varias entidades con un único DELETE. Retorna cuántas se borraron."""
+        if not ids:
+            return 0
+        model = cls.model
+        stmt = lambda_stmt(lambda: delete(model))
+        stmt += lambda s: s.where(model.id.in_(ids))
+        return db.session.execute(stmt).rowcount
     
     @classmethod
     def borrar(cls, entity: T) -> bool:
@@ -59,5 +233,22 @@ class BaseRepository(Generic[T]):
         if not entity:
             return False
         db.session.delete(entity)
-        db.session.commit()
+        db.session.flush()
         return True
+
+
+def _conversor(columna):
+    """Convierte un valor de texto del CSV al tipo Python de la columna (vacío = NULL)."""
+    try:
+        tipo = columna.type.python_type
+    except NotImplementedError:
+        tipo = str
+    if tipo is datetime.date:
+        convertir = datetime.date.fromisoformat
+    elif tipo is datetime.datetime:
+        convertir = datetime.datetime.fromisoformat
+    elif tipo is bool:
+        convertir = lambda v: v.lower() in ('1', 't', 'true')
+    else:
+        convertir = tipo
+    return lambda v: convertir(v) if v != '' else None
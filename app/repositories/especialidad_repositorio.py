@@ -1,16 +1,46 @@
+from itertools import chain
+from typing import Iterator
+from sqlalchemy import Row, String, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from app import db
-from app.models import Especialidad, Alumno
+from app.models import Especialidad, Alumno, Facultad, Universidad
+
+
+class fecha_iso(FunctionElement):
+    """Fecha formateada como 'YYYY-MM-DD' por la base de datos."""
+    type = String()
+    name = 'fecha_iso'
+    inherit_cache = True
+
+
+@compiles(fecha_iso)
+def _fecha_iso(element, compiler, **kw):
+    return "CAST(%s AS CHAR(10))" % compiler.process(element.clauses, **kw)
+
+
+@compiles(fecha_iso, 'postgresql')
+def _fecha_iso_postgresql(element, compiler, **kw):
+    return "to_char(%s, 'YYYY-MM-DD')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(fecha_iso, 'sqlite')
+def _fecha_iso_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%m-%%d', %s)" % compiler.process(element.clauses, **kw)
+
 
 class EspecialidadRepository:
 
     @staticmethod
     def crear(especialidad):
         db.session.add(especialidad)
-        db.session.commit()
+        db.session.flush()
 
     @staticmethod
     def buscar_por_id(id: int):
-        return db.session.query(Especialidad).filter_by(id=id).first()
+        # session.get consulta primero el identity map: dentro de una misma
+        # petición (una sesión) las búsquedas repetidas no van a la base
+        return db.session.get(Especialidad, id)
 
     @staticmethod
     def buscar_todos():
@@ -18,23 +48,118 @@ class EspecialidadRepository:
 
     @staticmethod
     def actualizar(especialidad) -> Especialidad:
-        db.session.merge(especialidad)
-        db.session.commit()
+        db.session.flush()
         return especialidad
     
     @staticmethod
     def borrar_por_id(id: int) -> bool:
-        especialidad = db.session.query(Especialidad).filter_by(id=id).first()
-        if not especialidad:
-            return False
-        db.session.delete(especialidad)
-        db.session.commit()
-        return True
+        borradas = db.session.query(Especialidad).filter(Especialidad.id == id).delete()
+        return borradas > 0
 
     @staticmethod
-    def buscar_alumnos_por_especialidad(especialidad_id: int) -> list[Alumno]:
+    def buscar_filas_alumnos_por_especialidad(especialidad_id: int) -> list[Row]:
         """
-        Busca todos los alumnos que pertenecen a una especialidad específica.
-        SRP: Este método solo se encarga de la consulta a la base de datos.
+        Busca una especialidad con los datos de su facultad y universidad y sus
+        alumnos, con Core: retorna filas planas sin construir objetos ORM. Un
+        único SELECT con LEFT OUTER JOIN a alumnos; facultad y universidad salen
+        de las columnas copiadas en Especialidad.
+
+        Cada fila trae, en orden:
+          0-3   especialidad: id, nombre, letra, observacion
+          4-7   facultad: id, nombre, abreviatura, sigla
+          8-10  universidad: id, nombre, sigla
+          11-18 alumno: id, nombre, apellido, nrodocumento, nro_legajo, sexo,
+                fecha_nacimiento, fecha_ingreso (todo None si no tiene alumnos)
+        Las fechas llegan ya formateadas en ISO por la base de datos.
+        Por nombre (row._mapping) las columnas repetidas llevan el prefijo de
+        su tabla: especialidad_id, facultad_nombre, alumno_id, etc.
+        Lista vacía si la especialidad no existe.
+
+        Si la especialidad todavía no tiene la copia (filas anteriores a las
+        columnas o escritas con inserciones/UPDATE masivos, ver
+        copiar_datos_facultad) se vuelve a consultar con JOIN a facultad y
+        universidad.
         """
-        return db.session.query(Alumno).filter_by(especialidad_id=especialidad_id).all()
+        filas = db.session.execute(_select_filas_alumnos(especialidad_id)).all()
+        if filas and not _copia_completa(filas[0]):
+            filas = db.session.execute(_select_filas_alumnos(especialidad_id, copia=False)).all()
+        return filas
+
+    @staticmethod
+    def iter_filas_alumnos_por_especialidad(especialidad_id: int, chunk: int = 500) -> Iterator[Row]:
+        """
+        Igual que buscar_filas_alumnos_por_especialidad pero trae las filas de
+        a `chunk` a medida que se recorren (memoria constante).
+        """
+        opciones = {'yield_per': chunk}
+        resultado = db.session.execute(_select_filas_alumnos(especialidad_id), execution_options=opciones)
+        primera = next(resultado, None)
+        if primera is None:
+            return iter(())
+        if not _copia_completa(primera):
+            resultado.close()
+            return iter(db.session.execute(_select_filas_alumnos(especialidad_id, copia=False),
+                                           execution_options=opciones))
+        return chain((primera,), resultado)
+
+    @staticmethod
+    def copiar_datos_facultad() -> int:
+        """
+        Completa en todas las especialidades las columnas copiadas de su
+        facultad y universidad (para filas creadas antes de existir, o tras
+        inserciones/UPDATE masivos que no emiten eventos). Retorna las filas
+        actualizadas. Desde la consola: `flask copiar-datos-facultad`.
+        """
+        facultad = (select(Facultad)
+                    .where(Facultad.id == Especialidad.facultad_id)
+                    .correlate(Especialidad))
+        universidad = (select(Universidad)
+                       .join(Facultad, Facultad.universidad_id == Universidad.id)
+                       .where(Facultad.id == Especialidad.facultad_id)
+                       .correlate(Especialidad))
+        resultado = db.session.execute(
+            update(Especialidad).values(
+                facultad_nombre=facultad.with_only_columns(Facultad.nombre).scalar_subquery(),
+                facultad_abreviatura=facultad.with_only_columns(Facultad.abreviatura).scalar_subquery(),
+                facultad_sigla=facultad.with_only_columns(Facultad.sigla).scalar_subquery(),
+                universidad_id=facultad.with_only_columns(Facultad.universidad_id).scalar_subquery(),
+                universidad_nombre=universidad.with_only_columns(Universidad.nombre).scalar_subquery(),
+                universidad_sigla=universidad.with_only_columns(Universidad.sigla).scalar_subquery(),
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        return resultado.rowcount
+
+
+def _copia_completa(fila) -> bool:
+    """True si la fila trae la copia de facultad y universidad (columnas 5-10)."""
+    return None not in fila[5:11]
+
+
+def _select_filas_alumnos(especialidad_id: int, copia: bool = True):
+    # Con `copia` los datos de facultad y universidad salen de las columnas
+    # copiadas en Especialidad y el único JOIN es con los alumnos; sin ella se
+    # leen de sus tablas (especialidades que aún no tienen la copia).
+    # Etiquetas sin ambigüedad (id, nombre y sigla se repiten entre tablas)
+    # para que row._mapping sea legible; el servicio igual desempaqueta por posición
+    if copia:
+        datos_facultad = (Especialidad.facultad_nombre, Especialidad.facultad_abreviatura.label('abreviatura'),
+                          Especialidad.facultad_sigla, Especialidad.universidad_id,
+                          Especialidad.universidad_nombre, Especialidad.universidad_sigla)
+    else:
+        datos_facultad = (Facultad.nombre.label('facultad_nombre'), Facultad.abreviatura,
+                          Facultad.sigla.label('facultad_sigla'), Universidad.id.label('universidad_id'),
+                          Universidad.nombre.label('universidad_nombre'),
+                          Universidad.sigla.label('universidad_sigla'))
+    stmt = select(Especialidad.id.label('especialidad_id'), Especialidad.nombre.label('especialidad_nombre'),
+                  Especialidad.letra, Especialidad.observacion, Especialidad.facultad_id,
+                  *datos_facultad,
+                  Alumno.id.label('alumno_id'), Alumno.nombre.label('alumno_nombre'), Alumno.apellido,
+                  Alumno.nrodocumento, Alumno.nro_legajo, Alumno.sexo,
+                  fecha_iso(Alumno.fecha_nacimiento).label('fecha_nacimiento'),
+                  fecha_iso(Alumno.fecha_ingreso).label('fecha_ingreso'))
+    if not copia:
+        stmt = (stmt.join(Facultad, Especialidad.facultad_id == Facultad.id)
+                .join(Universidad, Facultad.universidad_id == Universidad.id))
+    return (stmt.outerjoin(Alumno, Alumno.especialidad_id == Especialidad.id)
+            .where(Especialidad.id == especialidad_id))
@@ -0,0 +1,49 @@
+"""
+Unidad de trabajo (Unit of Work).
+Los repositorios solo hacen flush; la confirmación ocurre una única vez al
+final de la operación, ya sea un bloque `with unit_of_work()` o la petición HTTP.
+
+Solo las peticiones HTTP de escritura confirman solas (registrar_unit_of_work).
+Todo lo que llame a los servicios fuera de una petición (tareas en segundo
+plano, comandos `flask`, `flask shell`, scripts) debe hacerlo dentro de
+`with unit_of_work()`; si no, los cambios se pierden al cerrar la sesión.
+"""
+from contextlib import contextmanager
+from flask import Flask, request
+from app import db
+
+_METODOS_ESCRITURA = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Confirma los cambios al salir del bloque; revierte si hubo una excepción.
+
+    Uso:
+        with unit_of_work():
+            AlumnoService.crear(alumno)
+            AlumnoService.actualizar(otro_id, otro)
+    """
+    try:
+        yield db.session
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def registrar_unit_of_work(app: Flask):
+    """
+    Confirma al final de cada petición de escritura (POST/PUT/PATCH/DELETE).
+    Si la respuesta es un error, revierte lo que se haya hecho flush.
+    """
+
+    @app.after_request
+    def confirmar(response):
+        if request.method in _METODOS_ESCRITURA:
+            if response.status_code < 400:
+                db.session.commit()
+            else:
+                db.session.rollback()
+        return response
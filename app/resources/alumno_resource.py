@@ -1,15 +1,17 @@
+import io
 from flask import jsonify, Blueprint, request
 
 from app.mapping.alumno_mapping import AlumnoMapping
 from app.services.alumno_service import AlumnoService
+from app.resources.stream import respuesta_json_stream
 
 alumno_bp = Blueprint('alumno', __name__)
 alumno_mapping = AlumnoMapping()
 
 @alumno_bp.route('/alumno', methods=['GET'])
 def buscar_todos():
-    alumnos = AlumnoService.buscar_todos()
-    return alumno_mapping.dump(alumnos, many=True), 200
+    alumnos = AlumnoService.iter_todos()
+    return respuesta_json_stream(alumnos, alumno_mapping), 200
 
 @alumno_bp.route('/alumno/<hashid:id>', methods=['GET'])
 def buscar_por_id(id):
@@ -18,10 +20,25 @@ def buscar_por_id(id):
 
 @alumno_bp.route('/alumno', methods=['POST'])
 def crear():
-    alumno = alumno_mapping.load(request.get_json())
+    datos = request.get_json()
+    if isinstance(datos, list):
+        alumnos = alumno_mapping.load(datos, many=True)
+        AlumnoService.crear_muchos(alumnos)
+        return jsonify("Alumnos creados exitosamente"), 200
+    alumno = alumno_mapping.load(datos)
     AlumnoService.crear(alumno)
     return jsonify("Alumno creado exitosamente"), 200
 
+@alumno_bp.route('/alumno/importar', methods=['POST'])
+def importar():
+    """
+    Importación masiva: el cuerpo es un CSV (text/csv) con encabezado de columnas.
+    Se lee directamente del stream de la petición, sin cargarlo entero en memoria.
+    """
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    cantidad = AlumnoService.importar_csv(stream)
+    return jsonify({"importados": cantidad}), 200
+
 @alumno_bp.route('/alumno/<hashid:id>', methods=['PUT'])
 def actualizar(id):
     alumno = alumno_mapping.load(request.get_json())
@@ -15,6 +15,7 @@ from abc import ABC, abstractmethod
 from typing import Protocol, List, Optional
 from flask import jsonify, Blueprint, request
 from app.models import Alumno
+from app.repositories.uow import unit_of_work
 
 
 # PASO 1: Definir la abstracción (Interface/Protocol)
@@ -57,6 +58,9 @@ class AlumnoResource:
     - SRP: Solo maneja HTTP
     - OCP: Fácil cambiar implementación sin modificar esta clase
     - Testeable: Se puede inyectar un mock de IAlumnoService
+    
+    Los errores no se capturan aquí: los convierten en JSON los manejadores
+    globales registrados en create_app (ver app/errores.py).
     """
     
     def __init__(self, alumno_service: IAlumnoService, alumno_mapping):
@@ -72,70 +76,54 @@ class AlumnoResource:
     
     def buscar_todos(self):
         """GET /alumno - Lista todos los alumnos."""
-        try:
-            alumnos = self._service.buscar_todos()
-            return self._mapping.dump(alumnos, many=True), 200
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+        alumnos = self._service.buscar_todos()
+        return self._mapping.dump(alumnos, many=True), 200
     
     def buscar_por_id(self, id: int):
         """GET /alumno/<id> - Busca un alumno por ID."""
-        try:
-            alumno = self._service.buscar_por_id(id)
-            if not alumno:
-                return jsonify({"error": "Alumno no encontrado"}), 404
-            return self._mapping.dump(alumno), 200
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+        alumno = self._service.buscar_por_id(id)
+        if not alumno:
+            return jsonify({"error": "Alumno no encontrado"}), 404
+        return self._mapping.dump(alumno), 200
     
     def crear(self):
         """POST /alumno - Crea un nuevo alumno."""
-        try:
-            data = request.get_json()
-            if not data:
-                return jsonify({"error": "Datos inválidos"}), 400
-            
-            alumno = self._mapping.load(data)
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Datos inválidos"}), 400
+        
+        alumno = self._mapping.load(data)
+        with unit_of_work():
             alumno_creado = self._service.crear(alumno)
-            
-            return jsonify({
-                "mensaje": "Alumno creado exitosamente",
-                "id": alumno_creado.hashid
-            }), 201
-        except ValueError as e:
-            return jsonify({"error": str(e)}), 400
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+        
+        return jsonify({
+            "mensaje": "Alumno creado exitosamente",
+            "id": alumno_creado.hashid
+        }), 201
     
     def actualizar(self, id: int):
         """PUT /alumno/<id> - Actualiza un alumno."""
-        try:
-            data = request.get_json()
-            if not data:
-                return jsonify({"error": "Datos inválidos"}), 400
-            
-            alumno = self._mapping.load(data)
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Datos inválidos"}), 400
+        
+        alumno = self._mapping.load(data)
+        with unit_of_work():
             alumno_actualizado = self._service.actualizar(id, alumno)
-            
-            if not alumno_actualizado:
-                return jsonify({"error": "Alumno no encontrado"}), 404
-            
-            return jsonify({"mensaje": "Alumno actualizado exitosamente"}), 200
-        except ValueError as e:
-            return jsonify({"error": str(e)}), 400
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+        
+        if not alumno_actualizado:
+            return jsonify({"error": "Alumno no encontrado"}), 404
+        
+        return jsonify({"mensaje": "Alumno actualizado exitosamente"}), 200
     
     def borrar_por_id(self, id: int):
         """DELETE /alumno/<id> - Elimina un alumno."""
-        try:
+        with unit_of_work():
             eliminado = self._service.borrar_por_id(id)
-            if not eliminado:
-                return jsonify({"error": "Alumno no encontrado"}), 404
-            
-            return jsonify({"mensaje": "Alumno borrado exitosamente"}), 200
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+        if not eliminado:
+            return jsonify({"error": "Alumno no encontrado"}), 404
+        
+        return jsonify({"mensaje": "Alumno borrado exitosamente"}), 200
 
 
 # PASO 3: Factory o configuración centralizada
@@ -18,7 +18,12 @@ def buscar_por_id(id):
 
 @area_bp.route('/area', methods=['POST'])
 def crear():
-    area = area_mapping.load(request.get_json())
+    datos = request.get_json()
+    if isinstance(datos, list):
+        areas = area_mapping.load(datos, many=True)
+        AreaService.crear_muchos(areas)
+        return jsonify("Areas creadas exitosamente"), 200
+    area = area_mapping.load(datos)
     AreaService.crear(area) 
     return jsonify("Area creada exitosamente"), 200
 
@@ -18,7 +18,12 @@ def buscar_por_id(id):
 
 @cargo_bp.route('/cargo', methods=['POST'])
 def crear():
-    cargo = cargo_mapping.load(request.get_json())
+    datos = request.get_json()
+    if isinstance(datos, list):
+        cargos = cargo_mapping.load(datos, many=True)
+        CargoService.crear_muchos(cargos)
+        return jsonify("Cargos creados exitosamente"), 200
+    cargo = cargo_mapping.load(datos)
     CargoService.crear(cargo)
     return jsonify("cargo creada exitosamente"), 200
 
@@ -1,8 +1,17 @@
-from flask import Blueprint,  send_file
+import zipfile
+from io import BytesIO
+from flask import Blueprint, jsonify, send_file, url_for
 from app.services.alumno_service import AlumnoService
+from app.services.tareas import ColaLlena, obtener_cola
 
 certificado_bp = Blueprint('certificado', __name__)
 
+_MIMETYPES = {
+    'pdf': 'application/pdf',
+    'odt': 'application/vnd.oasis.opendocument.text',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
 @certificado_bp.route('/certificado/<int:id>/pdf', methods=['GET'])
 def certificado_en_pdf(id: int):
     pdf_io = AlumnoService.generar_certificado_alumno_regular(id,'pdf')
@@ -29,4 +38,59 @@ def reporte_en_docx(id: int):
         mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         as_attachment=True,
         download_name="certificado.docx"
-    )
\ No newline at end of file
+    )
+
+@certificado_bp.route('/certificado/especialidad/<int:id>/<any(pdf, odt, docx):tipo>', methods=['GET'])
+def certificados_por_especialidad(id: int, tipo: str):
+    """Retorna un .zip con los certificados de todos los alumnos de la especialidad."""
+    certificados = AlumnoService.generar_certificados_por_especialidad(id, tipo)
+    if not certificados:
+        return jsonify({"error": "La especialidad no tiene alumnos"}), 404
+
+    zip_io = BytesIO()
+    with zipfile.ZipFile(zip_io, 'w', zipfile.ZIP_DEFLATED) as archivo:
+        for alumno, documento in certificados:
+            archivo.writestr(f"certificado_{alumno.nro_legajo}.{tipo}", documento.getvalue())
+    zip_io.seek(0)
+
+    return send_file(
+        zip_io,
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f"certificados_{tipo}.zip"
+    )
+
+@certificado_bp.route('/certificado/<int:id>/<any(pdf, odt, docx):tipo>/tarea', methods=['POST'])
+def encolar_certificado(id: int, tipo: str):
+    """Encola la generación del certificado y retorna 202 con el ID de la tarea."""
+    try:
+        tarea_id = AlumnoService.encolar_certificado_alumno_regular(id, tipo)
+    except ColaLlena:
+        return jsonify({"error": "Demasiadas tareas pendientes"}), 503, {"Retry-After": "5"}
+    url = url_for('certificado.estado_certificado', tarea_id=tarea_id)
+    return jsonify({"tarea": tarea_id, "url": url}), 202, {"Location": url}
+
+@certificado_bp.route('/certificado/tarea/<tarea_id>', methods=['GET'])
+def estado_certificado(tarea_id: str):
+    """
+    Consulta una tarea de certificado: 202 mientras se genera y el documento
+    cuando terminó (una sola vez; luego se descarta).
+    """
+    cola = obtener_cola()
+    futuro = cola.obtener(tarea_id)
+    if futuro is None:
+        return jsonify({"error": "Tarea no encontrada"}), 404
+    if not futuro.done():
+        return jsonify({"tarea": tarea_id, "estado": "pendiente"}), 202
+
+    resultado = cola.retirar(tarea_id)
+    if resultado is None:
+        return jsonify({"error": "Alumno no encontrado"}), 404
+
+    tipo, documento = resultado
+    return send_file(
+        documento,
+        mimetype=_MIMETYPES[tipo],
+        as_attachment=tipo != 'pdf',
+        download_name=f"certificado.{tipo}"
+    )
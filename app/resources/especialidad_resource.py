@@ -1,11 +1,15 @@
-from flask import jsonify, Blueprint, request
+from flask import jsonify, Blueprint, Response, request, stream_with_context
 
 from app.mapping.especialidad_mapping import EspecialidadMapping
-from app.services.especialidad_service import EspecialidadService
+from app.services.especialidad_service import EspecialidadService, FORMATOS_SERIALIZACION
 
 especialidad_bp = Blueprint('especialidad', __name__)
 especialidad_mapping = EspecialidadMapping()
 
+# JSON primero: es el que se elige cuando el cliente acepta cualquier tipo
+_MIMETYPES = {'json': 'application/json', 'msgpack': 'application/msgpack'}
+_FORMATOS_POR_MIMETYPE = {_MIMETYPES[f]: f for f in FORMATOS_SERIALIZACION}
+
 @especialidad_bp.route('/especialidad', methods=['GET'])
 def buscar_todos():
     especialidades = EspecialidadService.buscar_todos()
@@ -39,6 +43,13 @@ def buscar_alumnos_por_especialidad(id):
     Endpoint REST que retorna todos los alumnos de una especialidad
     junto con los datos de la facultad.
     
+    Negocia el formato con el header Accept: JSON para navegadores y
+    application/msgpack para consumidores internos (si msgpack está instalado).
+    
+    Forma de "alumnos" según ?format=:
+    - filas (por defecto): [{"id": 1, "nombre": "Ana", ...}, ...]
+    - columnar: {"id": [1, ...], "nombre": ["Ana", ...], ...}
+    
     Cumple con:
     - SRP: Solo maneja la petición HTTP
     - OCP: Extensible sin modificar código existente
@@ -48,9 +59,27 @@ def buscar_alumnos_por_especialidad(id):
     if not id:
         return jsonify({"error": "ID de especialidad inválido"}), 400
     
-    resultado = EspecialidadService.buscar_alumnos_por_especialidad(id)
+    # Sin header Accept se responde JSON
+    mimetype = (request.accept_mimetypes.best_match(_FORMATOS_POR_MIMETYPE)
+                if request.accept_mimetypes else _MIMETYPES['json'])
+    if mimetype is None:
+        return jsonify({"error": "Formato no soportado"}), 406
+    
+    forma = request.args.get('format', 'filas')
+    if forma not in ('filas', 'columnar'):
+        return jsonify({"error": "format debe ser 'filas' o 'columnar'"}), 400
+    
+    formato = _FORMATOS_POR_MIMETYPE[mimetype]
+    if forma == 'columnar':
+        cuerpo = EspecialidadService.buscar_alumnos_por_especialidad_serializada(id, formato, columnar=True)
+    elif formato == 'json':
+        # JSON se envía por partes: memoria constante aunque haya miles de alumnos
+        partes = EspecialidadService.generar_alumnos_por_especialidad_json(id)
+        cuerpo = stream_with_context(partes) if partes is not None else None
+    else:
+        cuerpo = EspecialidadService.buscar_alumnos_por_especialidad_serializada(id, formato)
     
-    if not resultado:
+    if cuerpo is None:
         return jsonify({"error": "Especialidad no encontrada"}), 404
     
-    return jsonify(resultado), 200
+    return Response(cuerpo, status=200, mimetype=mimetype)
@@ -0,0 +1,27 @@
+"""
+Respuestas JSON enviadas por partes (streaming).
+Para listados grandes: no se arma la lista completa en memoria, cada bloque
+de entidades se serializa y se envía a medida que llega de la base de datos.
+"""
+from typing import Iterable
+from flask import Response, current_app, stream_with_context
+
+
+def respuesta_json_stream(entidades: Iterable, mapping, bloque: int = 500) -> Response:
+    """Retorna un array JSON con `mapping.dump(entidad)` de cada entidad."""
+    def generar():
+        dumps = current_app.json.dumps
+        yield '['
+        partes = []
+        primero = True
+        for entidad in entidades:
+            partes.append(dumps(mapping.dump(entidad)))
+            if len(partes) == bloque:
+                yield ('' if primero else ',') + ','.join(partes)
+                primero = False
+                partes = []
+        if partes:
+            yield ('' if primero else ',') + ','.join(partes)
+        yield ']'
+
+    return Response(stream_with_context(generar()), mimetype='application/json')
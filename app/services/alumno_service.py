@@ -1,9 +1,18 @@
 import datetime
+from functools import lru_cache
 from io import BytesIO
 from app.models import Alumno
 from app.repositories import AlumnoRepository
-from app.services.documentos_office_service import obtener_tipo_documento
+from app.services.documentos_office_service_refactored import DocumentGenerator, obtener_tipo_documento
 from app.services.base_service import BaseService
+from app.services.especialidad_service import EspecialidadService
+from app.services.tareas import obtener_cola
+
+
+@lru_cache(maxsize=1)
+def _formatear_fecha(dia: datetime.date) -> str:
+    """Formatea la fecha una vez por día (strftime con %B consulta el locale)."""
+    return dia.strftime('%d de %B de %Y')
 
 
 class AlumnoService(BaseService[Alumno, AlumnoRepository]):
@@ -13,6 +22,11 @@ class AlumnoService(BaseService[Alumno, AlumnoRepository]):
     """
     repository = AlumnoRepository
     
+    @classmethod
+    def _invalidar_cache(cls):
+        super()._invalidar_cache()
+        EspecialidadService.invalidar_cache_alumnos()
+    
     @classmethod
     def actualizar_campos(cls, alumno_existente: Alumno, alumno: Alumno):
         """Actualiza los campos específicos de Alumno."""
@@ -26,15 +40,26 @@ class AlumnoService(BaseService[Alumno, AlumnoRepository]):
         alumno_existente.fecha_ingreso = alumno.fecha_ingreso
         alumno_existente.especialidad = alumno.especialidad
     
+    @staticmethod
+    def _obtener_generador(tipo: str) -> DocumentGenerator | None:
+        """Generador registrado para `tipo`; None si el formato no está soportado."""
+        try:
+            return obtener_tipo_documento(tipo)
+        except ValueError:
+            return None
+    
     @classmethod
     def generar_certificado_alumno_regular(cls, id: int, tipo: str) -> BytesIO:
-        """Genera un certificado de alumno regular en el formato especificado."""
-        alumno = cls.repository.buscar_por_id(id)
+        """
+        Genera un certificado de alumno regular en el formato especificado.
+        None si el alumno no existe o el formato no está soportado.
+        """
+        alumno = cls.repository.buscar_por_id_con_jerarquia(id)
         if not alumno:
             return None
         
         context = cls._obtener_contexto_alumno(alumno)
-        documento = obtener_tipo_documento(tipo)
+        documento = cls._obtener_generador(tipo)
         if not documento:
             return None
         
@@ -44,11 +69,49 @@ class AlumnoService(BaseService[Alumno, AlumnoRepository]):
             context=context
         )
     
+    @classmethod
+    def encolar_certificado_alumno_regular(cls, id: int, tipo: str) -> str:
+        """
+        Encola la generación del certificado para que no bloquee la petición.
+        Retorna el ID de la tarea; su resultado es (tipo, BytesIO) o None.
+        """
+        return obtener_cola().encolar(cls._generar_certificado_tarea, id, tipo)
+    
+    @classmethod
+    def _generar_certificado_tarea(cls, id: int, tipo: str) -> tuple[str, BytesIO] | None:
+        documento = cls.generar_certificado_alumno_regular(id, tipo)
+        return (tipo, documento) if documento else None
+    
+    @classmethod
+    def generar_certificados_por_especialidad(cls, especialidad_id: int, tipo: str) -> list[tuple[Alumno, BytesIO]]:
+        """
+        Genera los certificados de alumno regular de todos los alumnos de una especialidad.
+        Usa una sola consulta y un único generador; especialidad, facultad,
+        universidad y fecha se comparten entre todos los contextos.
+        Lista vacía si no hay alumnos o el formato no está soportado.
+        """
+        alumnos = cls.repository.buscar_por_especialidad_con_jerarquia(especialidad_id)
+        if not alumnos:
+            return []
+        
+        documento = cls._obtener_generador(tipo)
+        if not documento:
+            return []
+        
+        contexto_comun = cls._obtener_contexto_alumno(alumnos[0])
+        return [
+            (alumno, documento.generar(
+                carpeta='certificado',
+                plantilla='certificado_pdf',
+                context={**contexto_comun, "alumno": alumno}
+            ))
+            for alumno in alumnos
+        ]
+    
     @staticmethod
     def _obtener_fecha_actual() -> str:
         """Retorna la fecha actual formateada."""
-        fecha_actual = datetime.datetime.now()
-        return fecha_actual.strftime('%d de %B de %Y')
+        return _formatear_fecha(datetime.date.today())
 
     @classmethod
     def _obtener_contexto_alumno(cls, alumno: Alumno) -> dict:
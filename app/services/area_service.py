@@ -9,6 +9,7 @@ class AreaService(BaseService[Area, AreaRepository]):
     Hereda operaciones CRUD de BaseService.
     """
     repository = AreaRepository
+    cache_ttl = 60
     
     @classmethod
     def actualizar_campos(cls, area_existente: Area, area: Area):
@@ -2,11 +2,62 @@
 Servicio base genérico para operaciones CRUD.
 Implementa el principio DRY eliminando código duplicado en todos los servicios.
 """
-from typing import TypeVar, Generic, Type, List, Optional
+from typing import TypeVar, Generic, Type, List, Optional, Iterator, Tuple, TextIO
+from flask import has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.services.cache import obtener_cache
 
 T = TypeVar('T')
 R = TypeVar('R')
 
+# Servicios con cache_ttl por modelo (los registra BaseService.__init_subclass__)
+_SERVICIOS_CACHEADOS: dict = {}
+
+
+def _invalidar_servicio(session: Session, servicio):
+    """
+    Descarta la cache de `servicio` ahora y la marca para descartarla otra vez
+    al terminar la transacción: entre el flush y el commit otra petición puede
+    volver a cachear los datos confirmados anteriores.
+    """
+    obtener_cache(servicio.__name__, ttl=servicio.cache_ttl).invalidar('todos')
+    session.info.setdefault('servicios_a_invalidar', set()).add(servicio)
+
+
+# Invalidación por eventos del ORM (igual que la cache de EspecialidadService):
+# cubre también los cambios que no pasan por los servicios.
+@event.listens_for(Session, 'after_flush')
+def _invalidar_en_flush(session, flush_context):
+    if not has_app_context():
+        return
+    servicios = {servicio
+                 for entity in (*session.new, *session.dirty, *session.deleted)
+                 for servicio in _SERVICIOS_CACHEADOS.get(type(entity), ())}
+    for servicio in servicios:
+        _invalidar_servicio(session, servicio)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidar_en_ejecucion_masiva(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete) or not has_app_context():
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        for servicio in _SERVICIOS_CACHEADOS.get(mapper.class_, ()):
+            _invalidar_servicio(orm_execute_state.session, servicio)
+
+
+# Tras un rollback también: la propia transacción pudo cachear datos no confirmados
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _invalidar_al_terminar(session):
+    servicios = session.info.pop('servicios_a_invalidar', ())
+    if has_app_context():
+        for servicio in servicios:
+            obtener_cache(servicio.__name__, ttl=servicio.cache_ttl).invalidar('todos')
+
 
 class BaseService(Generic[T, R]):
     """
@@ -20,15 +71,53 @@ class BaseService(Generic[T, R]):
                 existente.nombre = nuevo.nombre
                 existente.apellido = nuevo.apellido
                 # ... otros campos específicos
+    
+    Para tablas casi estáticas se puede cachear buscar_todos() definiendo
+    `cache_ttl` (segundos); la cache se invalida en cada escritura del modelo
+    (por el servicio o no) y otra vez al confirmarla.
     """
     
     repository: Type[R] = None
+    cache_ttl: int = 0
+    _campos_actualizables: Optional[Tuple[str, ...]] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Cada subclase calcula (una vez) sus propios campos actualizables
+        cls._campos_actualizables = None
+        if cls.cache_ttl and cls.repository is not None:
+            _SERVICIOS_CACHEADOS.setdefault(cls.repository.model, []).append(cls)
+    
+    @classmethod
+    def _invalidar_cache(cls):
+        # Las inserciones masivas (bulk, COPY) no emiten eventos del ORM
+        if cls.cache_ttl:
+            _invalidar_servicio(db.session, cls)
     
     @classmethod
     def crear(cls, entity: T) -> T:
         """Crea una nueva entidad."""
+        cls._invalidar_cache()
         return cls.repository.crear(entity)
     
+    @classmethod
+    def crear_muchos(cls, entities: List[T]) -> List[T]:
+        """Crea varias entidades en lotes."""
+        cls._invalidar_cache()
+        return cls.repository.crear_muchos(entities)
+    
+    @classmethod
+    def crear_muchos_mappings(cls, mappings: List[dict]) -> int:
+        """Crea varias filas a partir de diccionarios, sin construir entidades."""
+        cls._invalidar_cache()
+        return cls.repository.crear_muchos_mappings(mappings)
+    
+    @classmethod
+    def importar_csv(cls, stream: TextIO) -> int:
+        """Importa filas desde un CSV (COPY en PostgreSQL). Retorna cuántas se insertaron."""
+        cls._invalidar_cache()
+        return cls.repository.copiar_desde_csv(stream)
+    
     @classmethod
     def buscar_por_id(cls, id: int) -> Optional[T]:
         """Busca una entidad por su ID."""
@@ -36,8 +125,28 @@ class BaseService(Generic[T, R]):
     
     @classmethod
     def buscar_todos(cls) -> List[T]:
-        """Retorna todas las entidades."""
-        return cls.repository.buscar_todos()
+        """
+        Retorna todas las entidades.
+        Con `cache_ttl` se guardan los valores de columna (no las instancias,
+        que pertenecen a la sesión de otra petición) y se reconstruyen sin consultar.
+        """
+        if not cls.cache_ttl:
+            return cls.repository.buscar_todos()
+        cache = obtener_cache(cls.__name__, ttl=cls.cache_ttl)
+        filas = cache.obtener('todos')
+        if filas is not None:
+            return cls.repository.desde_valores(filas)
+        # Si se invalida mientras se lee (otra petición confirmó una escritura),
+        # lo leído ya es viejo y no se guarda
+        generacion = cache.generacion
+        entities = cls.repository.buscar_todos()
+        cache.guardar('todos', cls.repository.a_valores(entities), generacion)
+        return entities
+    
+    @classmethod
+    def iter_todos(cls) -> Iterator[T]:
+        """Itera todas las entidades sin cargarlas juntas en memoria."""
+        return cls.repository.iter_todos()
     
     @classmethod
     def actualizar(cls, id: int, entity: T) -> Optional[T]:
@@ -48,6 +157,10 @@ class BaseService(Generic[T, R]):
         existente = cls.repository.buscar_por_id(id)
         if not existente:
             return None
+        cls._invalidar_cache()
+        
+        # Las relaciones que llegan solo como FK se resuelven en lote
+        cls.repository.resolver_referencias(entity)
         
         # Llamar al método que actualiza campos específicos
         cls.actualizar_campos(existente, entity)
@@ -58,13 +171,32 @@ class BaseService(Generic[T, R]):
     def actualizar_campos(cls, existente: T, nuevo: T):
         """
         Método a sobrescribir en subclases para especificar qué campos actualizar.
-        Por defecto, copia todos los atributos excepto 'id'.
+        Por defecto, copia todos los atributos mapeados que tenga `nuevo`, excepto 'id'.
         """
-        for attr, value in nuevo.__dict__.items():
-            if attr not in ['_sa_instance_state', 'id'] and not attr.startswith('_'):
-                setattr(existente, attr, value)
+        valores = nuevo.__dict__
+        for campo in cls._obtener_campos_actualizables():
+            if campo in valores:
+                setattr(existente, campo, valores[campo])
+    
+    @classmethod
+    def _obtener_campos_actualizables(cls) -> Tuple[str, ...]:
+        """Atributos mapeados del modelo (columnas y relaciones), calculados una sola vez."""
+        if cls._campos_actualizables is None:
+            mapper = inspect(cls.repository.model)
+            cls._campos_actualizables = tuple(
+                attr.key for attr in mapper.attrs
+                if attr.key != 'id' and not attr.key.startswith('_')
+            )
+        return cls._campos_actualizables
     
     @classmethod
     def borrar_por_id(cls, id: int) -> bool:
         """Elimina una entidad por su ID."""
+        cls._invalidar_cache()
         return cls.repository.borrar_por_id(id)
+    
+    @classmethod
+    def borrar_muchos_por_id(cls, ids: List[int]) -> int:
+        """Elimina varias entidades por ID. Retorna cuántas se borraron."""
+        cls._invalidar_cache()
+        return cls.repository.borrar_muchos_por_id(ids)
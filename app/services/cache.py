@@ -0,0 +1,67 @@
+"""
+Cache en memoria con expiración (TTL) para datos de lectura frecuente.
+Cada aplicación Flask tiene sus propias caches (en app.extensions), por lo
+que los tests que crean una app nueva no comparten estado entre sí.
+"""
+import time
+from threading import Lock
+from typing import Any, Hashable, Optional
+from flask import current_app
+
+
+class CacheTTL:
+    """
+    Diccionario con expiración por entrada y tamaño máximo.
+    Al llenarse descarta la entrada más antigua.
+
+    `generacion` aumenta con cada invalidación: quien calcula un valor puede
+    anotarla antes de leer la base y pasarla a guardar(), que lo descarta si
+    entretanto se invalidó (el valor calculado ya sería viejo).
+    """
+
+    def __init__(self, ttl: int = 60, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.generacion = 0
+        self._datos: dict = {}
+        self._lock = Lock()
+
+    def obtener(self, clave: Hashable, default: Any = None) -> Any:
+        """Retorna el valor guardado o `default` si no existe o expiró."""
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return default
+        vence, valor = entrada
+        if vence < time.monotonic():
+            # Expirar no es invalidar: no cambia la generación
+            with self._lock:
+                self._datos.pop(clave, None)
+            return default
+        return valor
+
+    def guardar(self, clave: Hashable, valor: Any, generacion: Optional[int] = None):
+        with self._lock:
+            if generacion is not None and generacion != self.generacion:
+                return
+            if clave not in self._datos and len(self._datos) >= self.maxsize:
+                self._datos.pop(next(iter(self._datos)))
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+
+    def invalidar(self, clave: Hashable):
+        with self._lock:
+            self.generacion += 1
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self.generacion += 1
+            self._datos.clear()
+
+
+def obtener_cache(nombre: str, ttl: int = 60, maxsize: int = 128) -> CacheTTL:
+    """Retorna (creándola si no existe) la cache `nombre` de la aplicación actual."""
+    caches = current_app.extensions.setdefault('sysacad_cache', {})
+    cache: Optional[CacheTTL] = caches.get(nombre)
+    if cache is None:
+        cache = caches.setdefault(nombre, CacheTTL(ttl=ttl, maxsize=maxsize))
+    return cache
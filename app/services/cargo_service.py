@@ -9,6 +9,7 @@ class CargoService(BaseService[Cargo, CargoRepository]):
     Hereda operaciones CRUD de BaseService.
     """
     repository = CargoRepository
+    cache_ttl = 60
     
     @classmethod
     def actualizar_campos(cls, cargo_existente: Cargo, cargo: Cargo):
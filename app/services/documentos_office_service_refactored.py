@@ -12,6 +12,7 @@ SOLUCIÓN SOLID:
 - Fácil agregar nuevos formatos (DIP)
 """
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from io import BytesIO
 from typing import Dict, Type
 import os
@@ -30,6 +31,23 @@ from docxtpl import DocxTemplate
 import jinja2
 
 
+# Las plantillas y el entorno de Jinja se preparan una sola vez por proceso:
+# cada documento solo paga el renderizado, no la lectura de disco.
+_jinja_env = jinja2.Environment()
+
+
+@lru_cache(maxsize=32)
+def _leer_plantilla(path: str) -> bytes:
+    """Retorna el contenido de la plantilla, leyéndola de disco solo la primera vez."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=8)
+def _obtener_odt_renderer(media_path: str):
+    return get_odt_renderer(media_path=media_path)
+
+
 class DocumentGenerator(ABC):
     """
     Clase base abstracta para generadores de documentos.
@@ -89,23 +107,20 @@ class ODTDocumentGenerator(DocumentGenerator):
         return 'odt'
     
     def generar(self, carpeta: str, plantilla: str, context: dict) -> BytesIO:
-        import tempfile
-        
-        odt_renderer = get_odt_renderer(media_path=url_for('static', filename='media'))
+        odt_renderer = _obtener_odt_renderer(url_for('static', filename='media'))
         path_template = os.path.join(current_app.root_path, f'{carpeta}', f'{plantilla}.odt')
-        
-        odt_io = BytesIO()
-        with tempfile.NamedTemporaryFile(suffix='.odt', delete=False) as temp_file:
-            temp_path = temp_file.name
 
-        with ODTTemplate(path_template) as template:
+        # Se parte de los bytes cacheados: el render modifica el XML de la plantilla,
+        # por lo que cada documento necesita su propia instancia de ODTTemplate.
+        with ODTTemplate(BytesIO(_leer_plantilla(path_template))) as template:
             odt_renderer.render(template, context=context)
-            template.pack(temp_path)
-            with open(temp_path, 'rb') as f:
-                odt_io.write(f.read())
-            
-        os.unlink(temp_path)
-        odt_io.seek(0)
+            # pack() solo acepta una ruta: se escribe dentro del directorio temporal
+            # que ODTTemplate ya creó y que borra al salir del bloque.
+            salida = os.path.join(template.temp_dir.name, f'{plantilla}.odt')
+            template.pack(salida)
+            with open(salida, 'rb') as f:
+                odt_io = BytesIO(f.read())
+
         return odt_io
 
 
@@ -117,23 +132,13 @@ class DOCXDocumentGenerator(DocumentGenerator):
         return 'docx'
     
     def generar(self, carpeta: str, plantilla: str, context: dict) -> BytesIO:
-        import tempfile
-        
         path_template = os.path.join(current_app.root_path, f'{carpeta}', f'{plantilla}.docx')
-        doc = DocxTemplate(path_template)
-        
-        docx_io = BytesIO()
-        with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as temp_file:
-            temp_path = temp_file.name
+        doc = DocxTemplate(BytesIO(_leer_plantilla(path_template)))
+        doc.render(context, _jinja_env)
 
-        jinja_env = jinja2.Environment()
-        doc.render(context, jinja_env)
-        doc.save(temp_path)
-        
-        with open(temp_path, 'rb') as f:
-            docx_io.write(f.read())
-            
-        os.unlink(temp_path)
+        # DocxTemplate.save acepta un objeto tipo archivo: no hace falta disco
+        docx_io = BytesIO()
+        doc.save(docx_io)
         docx_io.seek(0)
         return docx_io
 
@@ -148,12 +153,14 @@ class DocumentGeneratorFactory:
     - SRP: Solo se encarga de crear y registrar generadores
     """
     
-    _generators: Dict[str, Type[DocumentGenerator]] = {}
+    _generators: Dict[str, DocumentGenerator] = {}
     
     @classmethod
     def register(cls, format_type: str, generator_class: Type[DocumentGenerator]):
         """
         Registra un nuevo generador de documentos.
+        Los generadores no tienen estado por documento, así que se instancian
+        una sola vez al registrarlos y se reutilizan en cada petición.
         
         OCP: Permite EXTENDER sin MODIFICAR.
         
@@ -161,30 +168,30 @@ class DocumentGeneratorFactory:
             format_type: Tipo de formato ('pdf', 'odt', 'docx', etc.)
             generator_class: Clase del generador
         """
-        cls._generators[format_type.lower()] = generator_class
+        cls._generators[format_type.lower()] = generator_class()
     
     @classmethod
     def create(cls, format_type: str) -> DocumentGenerator:
         """
-        Crea una instancia del generador solicitado.
+        Retorna el generador registrado para el formato solicitado.
         
         Args:
             format_type: Tipo de documento ('pdf', 'odt', 'docx')
             
         Returns:
-            Instancia del generador
+            Instancia (compartida) del generador
             
         Raises:
             ValueError: Si el formato no está registrado
         """
-        generator_class = cls._generators.get(format_type.lower())
-        if not generator_class:
+        generator = cls._generators.get(format_type.lower())
+        if not generator:
             available = ', '.join(cls._generators.keys())
             raise ValueError(
                 f"Formato '{format_type}' no soportado. "
                 f"Formatos disponibles: {available}"
             )
-        return generator_class()
+        return generator
     
     @classmethod
     def get_available_formats(cls) -> list[str]:
@@ -1,5 +1,172 @@
-from app.models import Especialidad
+from itertools import chain, islice
+from typing import Iterable, Iterator, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import hashids
+from app.models import Alumno, Especialidad, Facultad, Universidad
 from app.repositories import EspecialidadRepository
+from app.services.cache import obtener_cache
+from app.mapping.especialidad_alumnos_respuesta import (
+    AlumnoRespuesta, AlumnosColumnas, AlumnosPorEspecialidadColumnarRespuesta,
+    AlumnosPorEspecialidadRespuesta, EspecialidadRespuesta, FacultadRespuesta,
+    UniversidadRespuesta, como_dict
+)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+# Respuestas streameadas más grandes que esto no se cachean (memoria acotada)
+_MAX_BYTES_CACHE = 1024 * 1024
+
+# Modelos cuyos datos forman parte de la respuesta de buscar_alumnos_por_especialidad
+_MODELOS_CACHEADOS = (Alumno, Especialidad, Facultad, Universidad)
+
+
+def _cache_alumnos():
+    return obtener_cache('EspecialidadService.alumnos', maxsize=1024)
+
+
+def _encabezado(fila) -> tuple[EspecialidadRespuesta, FacultadRespuesta]:
+    """Arma especialidad y facultad (con universidad) desde las columnas 0-10 de una fila."""
+    (esp_id, esp_nombre, letra, observacion,
+     fac_id, fac_nombre, abreviatura, fac_sigla,
+     uni_id, uni_nombre, uni_sigla) = fila[:11]
+    codificar = hashids.encode
+    especialidad = EspecialidadRespuesta(
+        id=esp_id,
+        hashid=codificar(esp_id),
+        nombre=esp_nombre,
+        letra=letra,
+        observacion=observacion
+    )
+    facultad = FacultadRespuesta(
+        id=fac_id,
+        hashid=codificar(fac_id),
+        nombre=fac_nombre,
+        abreviatura=abreviatura,
+        sigla=fac_sigla,
+        universidad=UniversidadRespuesta(
+            id=uni_id,
+            hashid=codificar(uni_id),
+            nombre=uni_nombre,
+            sigla=uni_sigla
+        )
+    )
+    return especialidad, facultad
+
+
+def _alumnos(filas: Iterable) -> Iterator[AlumnoRespuesta]:
+    """Arma un AlumnoRespuesta por fila desde las columnas 11-18 (saltea el LEFT JOIN vacío)."""
+    codificar = hashids.encode
+    return (
+        AlumnoRespuesta(id, codificar(id), nombre, apellido, nrodocumento, nro_legajo,
+                        sexo, nacimiento, ingreso)
+        for id, nombre, apellido, nrodocumento, nro_legajo, sexo, nacimiento, ingreso
+        in (fila[11:] for fila in filas)
+        if id is not None
+    )
+
+
+def _columnas_alumnos(filas: Iterable) -> AlumnosColumnas:
+    """Transpone las columnas 11-18 de las filas (zip(*filas)) y agrega la columna hashid."""
+    columnas = list(zip(*(fila[11:] for fila in filas if fila[11] is not None)))
+    if not columnas:
+        return AlumnosColumnas(*([()] * 9))
+    ids, *resto = columnas
+    return AlumnosColumnas(ids, tuple(map(hashids.encode, ids)), *resto)
+
+
+def _generar_json(primera, filas: Iterator, clave, generacion: int, bloque: int = 500) -> Iterator[bytes]:
+    """
+    Serializa la respuesta en partes: encabezado y luego los alumnos de a
+    `bloque` a medida que llegan de la base de datos. Si el total no supera
+    _MAX_BYTES_CACHE, al terminar también se guarda en la cache (salvo que se
+    haya invalidado después de `generacion`, anotada antes de la consulta).
+
+    El encabezado se arma antes de retornar el generador: un error ahí todavía
+    llega al cliente como una respuesta de error y no como un 200 cortado.
+    """
+    dumps = current_app.json.dumps
+    especialidad, facultad = _encabezado(primera)
+    encabezado = f'{{"especialidad":{dumps(especialidad)},"facultad":{dumps(facultad)},"alumnos":['.encode()
+
+    def partes():
+        yield encabezado
+        alumnos = _alumnos(chain((primera,), filas))
+        separador = b''
+        while lote := list(islice(alumnos, bloque)):
+            yield separador + dumps(lote)[1:-1].encode()
+            separador = b','
+        yield b']}'
+
+    def enviar():
+        guardadas = []
+        tamaño = 0
+        for parte in partes():
+            if guardadas is not None:
+                tamaño += len(parte)
+                if tamaño > _MAX_BYTES_CACHE:
+                    guardadas = None
+                else:
+                    guardadas.append(parte)
+            yield parte
+
+        if guardadas is not None:
+            _cache_alumnos().guardar(clave, b''.join(guardadas), generacion)
+
+    return enviar()
+
+
+# Serializadores por formato (ver buscar_alumnos_por_especialidad_serializada)
+_SERIALIZADORES = {'json': lambda resultado: current_app.json.dumps(resultado).encode()}
+if MSGPACK_AVAILABLE:
+    _SERIALIZADORES['msgpack'] = lambda resultado: msgpack.packb(resultado, default=como_dict)
+FORMATOS_SERIALIZACION = tuple(_SERIALIZADORES)
+
+
+# Invalidación por eventos del ORM: cualquier flush o UPDATE/DELETE masivo que
+# toque alguno de los modelos descarta la cache en el momento (para que la misma
+# transacción no lea datos viejos) y otra vez al confirmar (por si otra petición
+# volvió a cachear los datos anteriores mientras tanto). Las inserciones masivas
+# (bulk_save_objects, COPY) no emiten eventos: AlumnoService invalida a mano.
+def _marcar_modificacion(session: Session):
+    if has_app_context():
+        session.info['invalidar_cache_alumnos'] = True
+        EspecialidadService.invalidar_cache_alumnos()
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidar_en_flush(session, flush_context):
+    for entity in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(entity, _MODELOS_CACHEADOS):
+            _marcar_modificacion(session)
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidar_en_ejecucion_masiva(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _MODELOS_CACHEADOS):
+        _marcar_modificacion(orm_execute_state.session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_al_confirmar(session):
+    if session.info.pop('invalidar_cache_alumnos', False) and has_app_context():
+        EspecialidadService.invalidar_cache_alumnos()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marca(session):
+    session.info.pop('invalidar_cache_alumnos', None)
+
 
 class EspecialidadService:
 
@@ -32,62 +199,132 @@ class EspecialidadService:
         return EspecialidadRepository.borrar_por_id(id)
 
     @staticmethod
-    def buscar_alumnos_por_especialidad(especialidad_id: int) -> dict:
+    def copiar_datos_facultad() -> int:
+        """
+        Completa en todas las especialidades los datos copiados de su facultad
+        y universidad. Retorna cuántas se actualizaron.
+        """
+        return EspecialidadRepository.copiar_datos_facultad()
+
+    @staticmethod
+    def invalidar_cache_alumnos():
+        """
+        Descarta las respuestas cacheadas de buscar_alumnos_por_especialidad.
+        Se llama automáticamente ante cambios del ORM en alumnos, especialidades,
+        facultades y universidades; a mano solo para inserciones masivas.
+        """
+        _cache_alumnos().limpiar()
+
+    @staticmethod
+    def generar_alumnos_por_especialidad_json(especialidad_id: int) -> Optional[Iterator[bytes]]:
+        """
+        Igual que buscar_alumnos_por_especialidad_serializada(id, 'json') pero
+        en partes, para enviar con streaming: los alumnos se leen del cursor y
+        se serializan de a bloques, sin armar la lista completa en memoria.
+        Un acierto de cache retorna los bytes guardados en una sola parte.
+        None si la especialidad no existe (se consulta antes de retornar).
+        """
+        cache = _cache_alumnos()
+        clave = (especialidad_id, 'json')
+        cuerpo = cache.obtener(clave)
+        if cuerpo is not None:
+            return iter((cuerpo,))
+        
+        generacion = cache.generacion
+        filas = EspecialidadRepository.iter_filas_alumnos_por_especialidad(especialidad_id)
+        primera = next(filas, None)
+        if primera is None:
+            return None
+        return _generar_json(primera, filas, clave, generacion)
+
+    @staticmethod
+    def buscar_alumnos_por_especialidad_serializada(especialidad_id: int, formato: str = 'json',
+                                                    columnar: bool = False) -> bytes:
+        """
+        Igual que buscar_alumnos_por_especialidad (o su variante columnar)
+        pero ya serializada en `formato` (uno de FORMATOS_SERIALIZACION: 'json'
+        y, si msgpack está instalado, 'msgpack' para consumidores internos).
+        Los bytes se cachean junto a la respuesta: un acierto no consulta la
+        base de datos ni vuelve a serializar. None si la especialidad no existe.
+        """
+        cache = _cache_alumnos()
+        clave = (especialidad_id, formato, 'columnar') if columnar else (especialidad_id, formato)
+        cuerpo = cache.obtener(clave)
+        if cuerpo is not None:
+            return cuerpo
+        
+        generacion = cache.generacion
+        buscar = (EspecialidadService.buscar_alumnos_por_especialidad_columnar if columnar
+                  else EspecialidadService.buscar_alumnos_por_especialidad)
+        resultado = buscar(especialidad_id)
+        if resultado is None:
+            return None
+        
+        cuerpo = _SERIALIZADORES[formato](resultado)
+        cache.guardar(clave, cuerpo, generacion)
+        return cuerpo
+
+    @staticmethod
+    def buscar_alumnos_por_especialidad(especialidad_id: int) -> AlumnosPorEspecialidadRespuesta:
         """
         Retorna todos los alumnos de una especialidad junto con los datos
         de la facultad a la que pertenece.
         
         Returns:
-            dict con estructura:
-            {
-                'especialidad': {...},
-                'facultad': {...},
-                'alumnos': [...]
-            }
+            AlumnosPorEspecialidadRespuesta con la especialidad, su facultad
+            (con la universidad) y los alumnos; None si no existe.
+        
+        La respuesta se cachea por especialidad (TTL de 60 s) y se descarta
+        ante cualquier alta, modificación o baja que la afecte. Es inmutable,
+        por lo que puede compartirse entre peticiones.
         """
-        # SRP: Delegar búsqueda al repositorio
-        especialidad = EspecialidadRepository.buscar_por_id(especialidad_id)
+        cache = _cache_alumnos()
+        resultado = cache.obtener(especialidad_id)
+        if resultado is not None:
+            return resultado
         
-        if not especialidad:
-            return None
+        # SRP: Delegar búsqueda al repositorio. Filas planas (Core), sin
+        # construir objetos ORM que solo se usarían para copiar sus campos
+        generacion = cache.generacion
+        filas = EspecialidadRepository.buscar_filas_alumnos_por_especialidad(especialidad_id)
         
-        # Obtener alumnos de la especialidad
-        alumnos = EspecialidadRepository.buscar_alumnos_por_especialidad(especialidad_id)
+        if not filas:
+            return None
         
         # KISS: Construir respuesta simple y clara
-        return {
-            'especialidad': {
-                'id': especialidad.id,
-                'hashid': especialidad.hashid,
-                'nombre': especialidad.nombre,
-                'letra': especialidad.letra,
-                'observacion': especialidad.observacion
-            },
-            'facultad': {
-                'id': especialidad.facultad.id,
-                'hashid': especialidad.facultad.hashid,
-                'nombre': especialidad.facultad.nombre,
-                'abreviatura': especialidad.facultad.abreviatura,
-                'sigla': especialidad.facultad.sigla,
-                'universidad': {
-                    'id': especialidad.facultad.universidad.id,
-                    'hashid': especialidad.facultad.universidad.hashid,
-                    'nombre': especialidad.facultad.universidad.nombre,
-                    'sigla': especialidad.facultad.universidad.sigla
-                }
-            },
-            'alumnos': [
-                {
-                    'id': alumno.id,
-                    'hashid': alumno.hashid,
-                    'nombre': alumno.nombre,
-                    'apellido': alumno.apellido,
-                    'nrodocumento': alumno.nrodocumento,
-                    'nro_legajo': alumno.nro_legajo,
-                    'sexo': alumno.sexo,
-                    'fecha_nacimiento': alumno.fecha_nacimiento.isoformat(),
-                    'fecha_ingreso': alumno.fecha_ingreso.isoformat()
-                }
-                for alumno in alumnos
-            ]
-        }
+        especialidad, facultad = _encabezado(filas[0])
+        resultado = AlumnosPorEspecialidadRespuesta(
+            especialidad=especialidad,
+            facultad=facultad,
+            alumnos=tuple(_alumnos(filas))
+        )
+        cache.guardar(especialidad_id, resultado, generacion)
+        return resultado
+
+    @staticmethod
+    def buscar_alumnos_por_especialidad_columnar(especialidad_id: int) -> AlumnosPorEspecialidadColumnarRespuesta:
+        """
+        Igual que buscar_alumnos_por_especialidad pero con los alumnos por
+        columnas: {"id": [...], "hashid": [...], "nombre": [...], ...}.
+        Los nombres de campo no se repiten por alumno (respuesta más chica) y
+        leer un solo campo de todos los alumnos no recorre los demás.
+        """
+        cache = _cache_alumnos()
+        clave = (especialidad_id, 'columnar')
+        resultado = cache.obtener(clave)
+        if resultado is not None:
+            return resultado
+        
+        generacion = cache.generacion
+        filas = EspecialidadRepository.buscar_filas_alumnos_por_especialidad(especialidad_id)
+        if not filas:
+            return None
+        
+        especialidad, facultad = _encabezado(filas[0])
+        resultado = AlumnosPorEspecialidadColumnarRespuesta(
+            especialidad=especialidad,
+            facultad=facultad,
+            alumnos=_columnas_alumnos(filas)
+        )
+        cache.guardar(clave, resultado, generacion)
+        return resultado
@@ -0,0 +1,89 @@
+"""
+Cola de tareas en segundo plano para trabajos pesados (p. ej. renderizar PDFs).
+Las tareas corren en un pool de hilos propio de cada aplicación Flask, dentro
+de su propio app context (y por lo tanto con su propia sesión de base de datos)
+y de una unidad de trabajo: lo que la tarea escriba se confirma al terminar.
+El resultado queda en memoria hasta que el cliente lo retira.
+
+Si la tarea se encola durante una petición, corre además en un contexto de
+petición con la misma URL base, para que url_for(..., _external=True) funcione
+igual que en la petición original.
+
+Límites: la cola vive en la memoria de un proceso, por lo que con varios
+workers (gunicorn -w N) la consulta del resultado tiene que llegar al mismo
+proceso que la encoló; si no, responde 404. Y guarda a lo sumo `maxsize`
+tareas: con la cola llena de tareas sin retirar, encolar lanza ColaLlena.
+"""
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+from flask import Flask, current_app, has_request_context, request
+
+
+class ColaLlena(RuntimeError):
+    """La cola ya tiene `maxsize` tareas pendientes o sin retirar."""
+
+
+class ColaTareas:
+    """Encola funciones en un ThreadPoolExecutor y guarda sus futuros por ID."""
+
+    def __init__(self, app: Flask, max_workers: int = 2, maxsize: int = 256):
+        self.app = app
+        self.maxsize = maxsize
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sysacad-tarea')
+        self._tareas: dict[str, Future] = {}
+        self._lock = Lock()
+
+    def encolar(self, funcion: Callable, *args, **kwargs) -> str:
+        """Encola `funcion(*args, **kwargs)` y retorna el ID de la tarea."""
+        tarea_id = uuid.uuid4().hex
+        base_url = request.url_root if has_request_context() else None
+        with self._lock:
+            if len(self._tareas) >= self.maxsize and not self._descartar_terminada():
+                raise ColaLlena(f"Hay {self.maxsize} tareas sin retirar")
+            self._tareas[tarea_id] = self._executor.submit(self._ejecutar, funcion, base_url,
+                                                           *args, **kwargs)
+        return tarea_id
+
+    def obtener(self, tarea_id: str) -> Optional[Future]:
+        return self._tareas.get(tarea_id)
+
+    def retirar(self, tarea_id: str) -> Any:
+        """Retorna el resultado de una tarea terminada y la elimina de la cola."""
+        with self._lock:
+            futuro = self._tareas.pop(tarea_id)
+        return futuro.result()
+
+    def _ejecutar(self, funcion: Callable, base_url: Optional[str], *args, **kwargs) -> Any:
+        from app import db
+        from app.repositories.uow import unit_of_work
+        contexto = (self.app.test_request_context(base_url=base_url) if base_url
+                    else self.app.app_context())
+        with contexto:
+            try:
+                with unit_of_work():
+                    return funcion(*args, **kwargs)
+            finally:
+                db.session.remove()
+
+    def _descartar_terminada(self) -> bool:
+        """Descarta la tarea terminada más antigua; False si todas siguen pendientes."""
+        for tarea_id, futuro in self._tareas.items():
+            if futuro.done():
+                del self._tareas[tarea_id]
+                return True
+        return False
+
+
+def obtener_cola() -> ColaTareas:
+    """Retorna (creándola si no existe) la cola de tareas de la aplicación actual."""
+    extensiones = current_app.extensions
+    cola = extensiones.get('sysacad_tareas')
+    if cola is None:
+        app = current_app._get_current_object()
+        cola = extensiones.setdefault(
+            'sysacad_tareas',
+            ColaTareas(app, max_workers=app.config.get('TAREAS_WORKERS', 2))
+        )
+    return cola
@@ -159,6 +159,21 @@ def nuevoalumno(nombre="Juan", apellido="Pérez", nrodocumento="46291002", tipo_
     AlumnoService.crear(alumno)
     return alumno
 
+def bulk_nuevos_alumnos(especialidad, specs, tipo_documento=None):
+    """
+    Crea varios alumnos de `especialidad` con un único INSERT por lotes.
+    Cada spec es un dict que pisa los valores por defecto de nuevoalumno.
+    Retorna la cantidad creada (no hay instancias: se insertan mappings).
+    """
+    tipo_documento_id = (tipo_documento or nuevotipodocumento()).id
+    defaults = dict(nombre="Juan", apellido="Pérez", nrodocumento="46291002",
+                    fecha_nacimiento=date(1990, 1, 1), sexo="M", nro_legajo=123456,
+                    fecha_ingreso=date(2020, 1, 1))
+    return AlumnoService.crear_muchos_mappings([
+        {**defaults, **spec, "tipo_documento_id": tipo_documento_id, "especialidad_id": especialidad.id}
+        for spec in specs
+    ])
+
 def nuevaautoridad(nombre="Pelo", cargo=None, telefono="123456789", email="123@gmail.com", 
                    materias=None, facultades=None):
     autoridad = Autoridad()
@@ -6,8 +6,10 @@ from datetime import date
 from app.models.tipodocumento import TipoDocumento
 from app.models.alumno import Alumno
 from app.services import AlumnoService
-from app.services import TipoDocumentoService
-from test.instancias import nuevoalumno, nuevotipodocumento
+from app.repositories import AlumnoRepository
+from app.services import TipoDocumentoService, AreaService
+from app.services.tareas import obtener_cola
+from test.instancias import nuevoalumno, nuevotipodocumento, nuevaespecialidad, nuevaarea
 from app import db
 
 class AlumnoTestCase(unittest.TestCase):
@@ -58,6 +60,173 @@ class AlumnoTestCase(unittest.TestCase):
         self.assertIsNotNone(alumnos)
         self.assertEqual(len(alumnos), 2)
 
+    def test_endpoint_buscar_todos(self):
+        nuevoalumno(nombre="Ana")
+        nuevoalumno(nombre="Luis")
+        with self.app.test_client() as client:
+            response = client.get('/api/v1/alumno')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content_type, 'application/json')
+            data = response.get_json()
+        self.assertEqual(sorted(a['nombre'] for a in data), ["Ana", "Luis"])
+
+    def test_crear_muchos_endpoint(self):
+        tipo_documento = nuevotipodocumento()
+        especialidad = nuevaespecialidad()
+        datos = [{
+            "nombre": f"Alumno {i}",
+            "apellido": "Lote",
+            "nrodocumento": str(30000000 + i),
+            "tipo_documento_id": tipo_documento.id,
+            "fecha_nacimiento": "1999-01-01",
+            "sexo": "F",
+            "nro_legajo": 1000 + i,
+            "fecha_ingreso": "2020-03-01",
+            "especialidad_id": especialidad.id
+        } for i in range(3)]
+        with self.app.test_client() as client:
+            response = client.post('/api/v1/alumno', json=datos)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(AlumnoService.buscar_todos()), 3)
+
+    def test_importar_csv_endpoint(self):
+        tipo_documento = nuevotipodocumento()
+        especialidad = nuevaespecialidad()
+        filas = ["nombre,apellido,nrodocumento,tipo_documento_id,fecha_nacimiento,sexo,nro_legajo,fecha_ingreso,especialidad_id"]
+        filas += [f"Alumno {i},Lote,{40000000 + i},{tipo_documento.id},1999-01-01,F,{2000 + i},2020-03-01,{especialidad.id}"
+                  for i in range(3)]
+        with self.app.test_client() as client:
+            response = client.post('/api/v1/alumno/importar', data="\n".join(filas), content_type='text/csv')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["importados"], 3)
+            response = client.post('/api/v1/alumno/importar', data="nombre,inexistente\nx,y", content_type='text/csv')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(AlumnoService.buscar_todos()), 3)
+
+    def test_endpoint_datos_invalidos(self):
+        with self.app.test_client() as client:
+            response = client.post('/api/v1/alumno', json={"nombre": "Sin apellido"})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.get_json())
+            response = client.get('/api/v1/ruta/inexistente')
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.content_type, 'application/json')
+            self.assertIn("error", response.get_json())
+            response = client.patch('/api/v1/alumno')
+            self.assertEqual(response.status_code, 405)
+            self.assertIn("GET", response.headers['Allow'])
+            self.assertIn("error", response.get_json())
+            response = client.post('/api/v1/alumno/importar', data="nombre,fecha_nacimiento\nAna,ayer",
+                                   content_type='text/csv')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Línea 2", response.get_json()["error"])
+
+    def test_endpoint_error_interno_no_expone_detalles(self):
+        def falla():
+            raise ValueError("SELECT * FROM alumnos WHERE clave = 'secreta'")
+        self.app.add_url_rule('/falla', 'falla', falla)
+        with self.app.test_client() as client:
+            response = client.get('/falla')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.get_json(), {"error": "Error interno"})
+
+    def test_buscar_por_id_con_jerarquia(self):
+        alumno = nuevoalumno()
+        db.session.expunge_all()
+        r = AlumnoRepository.buscar_por_id_con_jerarquia(alumno.id)
+        self.assertIn('tipo_documento', r.__dict__)
+        self.assertIn('especialidad', r.__dict__)
+        self.assertIn('facultad', r.especialidad.__dict__)
+        self.assertIn('universidad', r.especialidad.facultad.__dict__)
+        self.assertEqual(r.especialidad.facultad.universidad.sigla, "UN")
+
+    def test_buscar_por_especialidad_con_jerarquia(self):
+        especialidad = nuevaespecialidad()
+        nuevoalumno(nombre="Ana", especialidad=especialidad)
+        nuevoalumno(nombre="Luis", especialidad=especialidad)
+        nuevoalumno(nombre="Otro")
+        especialidad_id = especialidad.id
+        db.session.expunge_all()
+        alumnos = AlumnoRepository.buscar_por_especialidad_con_jerarquia(especialidad_id)
+        self.assertEqual(sorted(a.nombre for a in alumnos), ["Ana", "Luis"])
+        self.assertIs(alumnos[0].especialidad, alumnos[1].especialidad)
+        self.assertIn('universidad', alumnos[0].especialidad.facultad.__dict__)
+
+    def test_certificado_formato_no_soportado(self):
+        alumno = nuevoalumno()
+        self.assertIsNone(AlumnoService.generar_certificado_alumno_regular(alumno.id, 'xls'))
+        self.assertEqual(AlumnoService.generar_certificados_por_especialidad(alumno.especialidad_id, 'xls'), [])
+
+    def test_endpoint_certificados_especialidad_sin_alumnos(self):
+        with self.app.test_client() as client:
+            response = client.get('/api/v1/certificado/especialidad/999/docx')
+            self.assertEqual(response.status_code, 404)
+
+    def test_endpoint_certificado_en_segundo_plano(self):
+        with self.app.test_client() as client:
+            response = client.post('/api/v1/certificado/999/docx/tarea')
+            self.assertEqual(response.status_code, 202)
+            tarea_id = response.get_json()['tarea']
+            obtener_cola().obtener(tarea_id).result(timeout=10)
+            response = client.get(response.headers['Location'])
+            self.assertEqual(response.status_code, 404)
+            response = client.get(f'/api/v1/certificado/tarea/{tarea_id}')
+            self.assertEqual(response.status_code, 404)
+
+    def test_endpoint_certificado_en_segundo_plano_con_url_externa(self):
+        import time
+        from io import BytesIO
+        from flask import url_for
+        from app.services.documentos_office_service_refactored import (
+            DocumentGenerator, DocumentGeneratorFactory)
+
+        # Igual que los generadores de PDF y ODT: arma URLs de static absolutas
+        class GeneradorConUrl(DocumentGenerator):
+            extension = 'pdf'
+            def generar(self, carpeta, plantilla, context):
+                return BytesIO(url_for('static', filename='', _external=True).encode())
+
+        original = DocumentGeneratorFactory._generators['pdf']
+        DocumentGeneratorFactory.register('pdf', GeneradorConUrl)
+        alumno = nuevoalumno()
+        db.session.commit()
+        try:
+            with self.app.test_client() as client:
+                sincronico = client.get(f'/api/v1/certificado/{alumno.id}/pdf')
+                response = client.post(f'/api/v1/certificado/{alumno.id}/pdf/tarea')
+                self.assertEqual(response.status_code, 202)
+                url = response.headers['Location']
+                for _ in range(100):
+                    response = client.get(url)
+                    if response.status_code != 202:
+                        break
+                    time.sleep(0.1)
+        finally:
+            DocumentGeneratorFactory._generators['pdf'] = original
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/pdf')
+        self.assertEqual(response.data, sincronico.data)
+        self.assertEqual(response.data, b'http://localhost/static/')
+
+    def test_cola_tareas_llena(self):
+        from threading import Event
+        from app.services.tareas import ColaLlena, ColaTareas
+        cola = ColaTareas(self.app, max_workers=1, maxsize=1)
+        liberar = Event()
+        tarea_id = cola.encolar(liberar.wait)
+        with self.assertRaises(ColaLlena):
+            cola.encolar(liberar.wait)
+        liberar.set()
+        cola.retirar(tarea_id)
+        cola.retirar(cola.encolar(liberar.wait))
+
+    def test_tarea_confirma_sus_cambios(self):
+        # AreaService solo hace flush: sin unidad de trabajo el alta se perdería
+        tarea_id = obtener_cola().encolar(nuevaarea, nombre="Fisica")
+        obtener_cola().retirar(tarea_id)
+        db.session.remove()
+        self.assertEqual([a.nombre for a in AreaService.buscar_todos()], ["Fisica"])
+
     def test_actualizar(self):
         alumno = nuevoalumno()
         alumno.nombre = "Juan actualizado"
@@ -65,6 +234,19 @@ class AlumnoTestCase(unittest.TestCase):
         self.assertEqual(alumno_actualizado.nombre, "Juan actualizado")
     
     
+    def test_actualizar_con_fks(self):
+        alumno = nuevoalumno()
+        otra_especialidad = nuevaespecialidad(nombre="Otra Especialidad")
+        datos = Alumno(nombre="Juan", apellido="Pérez", nrodocumento="46291002",
+                       tipo_documento_id=alumno.tipo_documento_id,
+                       fecha_nacimiento=date(1990, 1, 1), sexo="M", nro_legajo=123456,
+                       fecha_ingreso=date(2020, 1, 1), especialidad_id=otra_especialidad.id)
+        actualizado = AlumnoService.actualizar(alumno.id, datos)
+        db.session.flush()
+        self.assertIs(actualizado.especialidad, otra_especialidad)
+        self.assertEqual(actualizado.especialidad_id, otra_especialidad.id)
+        self.assertEqual(actualizado.tipo_documento.sigla, "DNI")
+
     def test_borrar(self):
         alumno = nuevoalumno()
         borrado = AlumnoService.borrar_por_id(alumno.id)
@@ -3,7 +3,9 @@ import os
 from flask import current_app
 from app import create_app
 from app.models.area import Area
-from app.services import AreaService
+from app.services import AreaService, BaseService
+from app.repositories import AreaRepository
+from app.repositories.uow import unit_of_work
 from test.instancias import nuevaarea
 from app import db
 
@@ -40,15 +42,118 @@ class AreaTestCase(unittest.TestCase):
         self.assertIsNotNone(areas)
         self.assertEqual(len(areas), 2)
 
+    def test_buscar_todos_cacheado(self):
+        nuevaarea("Matematica")
+        db.session.commit()
+        AreaService.buscar_todos()
+        # Un cambio por fuera del servicio también invalida la cache
+        db.session.query(Area).update({Area.nombre: "Cambiada"})
+        db.session.commit()
+        db.session.expunge_all()
+        areas = AreaService.buscar_todos()
+        self.assertEqual([a.nombre for a in areas], ["Cambiada"])
+        # Una escritura a través del servicio también
+        nuevaarea("Fisica")
+        nombres = sorted(a.nombre for a in AreaService.buscar_todos())
+        self.assertEqual(nombres, ["Cambiada", "Fisica"])
+
+    def test_buscar_todos_cache_invalidada_al_confirmar(self):
+        from app.services.cache import obtener_cache
+        area = nuevaarea("A1")
+        db.session.commit()
+        valores_confirmados = AreaRepository.a_valores(AreaService.buscar_todos())
+        area.nombre = "A2"
+        AreaService.actualizar(area.id, area)
+        # Otra petición vuelve a cachear lo confirmado entre el flush y el commit
+        obtener_cache('AreaService').guardar('todos', valores_confirmados)
+        areas = AreaService.buscar_todos()
+        self.assertIs(areas[0], area)
+        self.assertEqual(area.nombre, "A2")
+        db.session.commit()
+        db.session.expunge_all()
+        self.assertEqual([a.nombre for a in AreaService.buscar_todos()], ["A2"])
+
+    def test_buscar_todos_invalidada_durante_la_lectura(self):
+        from unittest import mock
+        from app.services.cache import obtener_cache
+        nuevaarea("A1")
+        db.session.commit()
+        cache = obtener_cache('AreaService')
+        buscar_todos = AreaRepository.buscar_todos
+
+        def leer_e_invalidar():
+            entities = buscar_todos()
+            # Otra petición confirma una escritura antes de que se guarde lo leído
+            cache.invalidar('todos')
+            return entities
+
+        with mock.patch.object(AreaRepository, 'buscar_todos', side_effect=leer_e_invalidar):
+            self.assertEqual([a.nombre for a in AreaService.buscar_todos()], ["A1"])
+        self.assertIsNone(cache.obtener('todos'))
+
+    def test_copiar_desde_csv_segun_driver(self):
+        import io
+        from unittest import mock
+        for driver in ('psycopg2', 'psycopg'):
+            conexion = mock.MagicMock()
+            conexion.dialect.name = 'postgresql'
+            conexion.dialect.driver = driver
+            conexion.dialect.identifier_preparer.format_table.return_value = 'areas'
+            conexion.dialect.identifier_preparer.quote.side_effect = lambda c: c
+            cursor = conexion.connection.cursor.return_value.__enter__.return_value
+            cursor.rowcount = 2
+            copia = cursor.copy.return_value.__enter__.return_value
+            with mock.patch.object(db.session, 'connection', return_value=conexion):
+                total = AreaRepository.copiar_desde_csv(io.StringIO("nombre\nFisica\nQuimica\n"))
+            self.assertEqual(total, 2)
+            if driver == 'psycopg2':
+                cursor.copy_expert.assert_called_once()
+                cursor.copy.assert_not_called()
+            else:
+                cursor.copy.assert_called_once_with("COPY areas (nombre) FROM STDIN WITH CSV")
+                copia.write.assert_called_once_with("Fisica\nQuimica\n")
+                cursor.copy_expert.assert_not_called()
+
+    def test_crear_muchos(self):
+        areas = [Area(nombre=f"Area {i}") for i in range(5)]
+        AreaService.crear_muchos(areas)
+        self.assertEqual(len(AreaService.buscar_todos()), 5)
+
+    def test_unit_of_work_revierte(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                nuevaarea()
+                raise RuntimeError("falla en medio de la operación")
+        self.assertEqual(len(AreaService.buscar_todos()), 0)
+
     def test_actualizar(self):
         area = nuevaarea()
         area.nombre = "nombre actualizado"
         area_actualizado = AreaService.actualizar(area.id, area)
         self.assertEqual(area_actualizado.nombre, "nombre actualizado")
 
+    def test_actualizar_campos_por_defecto(self):
+        class AreaServiceGenerico(BaseService):
+            repository = AreaRepository
+
+        area = nuevaarea()
+        nueva = Area()
+        nueva.nombre = "nombre generico"
+        actualizada = AreaServiceGenerico.actualizar(area.id, nueva)
+        self.assertEqual(actualizada.id, area.id)
+        self.assertEqual(actualizada.nombre, "nombre generico")
+        self.assertEqual(AreaServiceGenerico._campos_actualizables, ('nombre',))
+
     def test_borrar(self):
         area = nuevaarea()
         borrado= AreaService.borrar_por_id(area.id)
         self.assertTrue(borrado)
         resultado = AreaService.buscar_por_id(area.id)
         self.assertIsNone(resultado)
+
+    def test_borrar_muchos_por_id(self):
+        areas = [nuevaarea(f"Area {i}") for i in range(3)]
+        borradas = AreaService.borrar_muchos_por_id([areas[0].id, areas[1].id])
+        self.assertEqual(borradas, 2)
+        self.assertEqual(len(AreaService.buscar_todos()), 1)
+        self.assertFalse(AreaService.borrar_por_id(areas[0].id))
@@ -1,6 +1,6 @@
 import os
 import unittest
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 from app import create_app, db
 
 
@@ -22,6 +22,10 @@ class ConnectionTestCase(unittest.TestCase):
     def test_db_connection(self):
         result = db.session.query(text("'Hello world'")).one()
         self.assertEqual(result[0], 'Hello world')
+
+    def test_indice_alumnos_por_especialidad(self):
+        indices = {i['name']: i['column_names'] for i in inspect(db.engine).get_indexes('alumnos')}
+        self.assertEqual(indices.get('ix_alumnos_especialidad_id'), ['especialidad_id'])
     
 if __name__ == '__main__':
     unittest.main()
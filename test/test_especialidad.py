@@ -1,24 +1,67 @@
 import unittest
 import os
 from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
 from app import create_app
 from app.models import Especialidad, TipoEspecialidad
 from app.services import EspecialidadService, TipoEspecialidadService
+from app.services.especialidad_service import MSGPACK_AVAILABLE
+from app.repositories import EspecialidadRepository
 from test.instancias import nuevaespecialidad, nuevotipoespecialidad
 from app import db
 
 class EspecialidadTestCase(unittest.TestCase):
-    def setUp(self):
+    """
+    El esquema se crea una sola vez por clase. Cada test corre dentro de una
+    transacción que se revierte al final; los commit() del código bajo prueba
+    solo liberan un SAVEPOINT dentro de ella.
+    """
+
+    @classmethod
+    def setUpClass(cls):
         os.environ['FLASK_CONTEXT'] = 'testing'
-        self.app = create_app()
-        self.app_context = self.app.app_context()
-        self.app_context.push()
+        cls.app = create_app()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        if db.engine.dialect.name == 'sqlite':
+            cls._habilitar_savepoints_sqlite(db.engine)
         db.create_all()
+        cls.session_original = db.session
 
-    def tearDown(self):
+    @staticmethod
+    def _habilitar_savepoints_sqlite(engine):
+        # pysqlite maneja las transacciones por su cuenta y rompe los SAVEPOINT:
+        # se le quita ese manejo y SQLAlchemy emite el BEGIN (receta de SQLAlchemy)
+        @event.listens_for(engine, 'connect')
+        def _connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def _begin(conn):
+            conn.exec_driver_sql('BEGIN')
+
+        engine.dispose()
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session = cls.session_original
         db.session.remove()
         db.drop_all()
-        self.app_context.pop()
+        cls.app_context.pop()
+
+    def setUp(self):
+        # Las caches viven en la app, que ahora es compartida por todos los tests
+        self.app.extensions.pop('sysacad_cache', None)
+        self.connection = db.engine.connect()
+        self.transaction = self.connection.begin()
+        db.session = scoped_session(sessionmaker(bind=self.connection,
+                                                 join_transaction_mode='create_savepoint'))
+
+    def tearDown(self):
+        db.session.remove()
+        self.transaction.rollback()
+        self.connection.close()
 
     def test_crear(self):
         especialidad= nuevaespecialidad()
@@ -35,6 +78,18 @@ class EspecialidadTestCase(unittest.TestCase):
         self.assertEqual(r.nombre, "Matematicas")
         self.assertEqual(r.letra, "A")
 
+    def test_buscar_por_id_usa_identity_map(self):
+        from sqlalchemy import event
+        especialidad = nuevaespecialidad()
+        consultas = []
+        escuchar = lambda *args: consultas.append(args)
+        event.listen(db.engine, 'before_cursor_execute', escuchar)
+        try:
+            self.assertIs(EspecialidadService.buscar_por_id(especialidad.id), especialidad)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', escuchar)
+        self.assertEqual(consultas, [])
+
     def test_buscar_todos(self):
         especialidad1 =nuevaespecialidad()
         especialidad2 =nuevaespecialidad()
@@ -57,15 +112,17 @@ class EspecialidadTestCase(unittest.TestCase):
 
     def test_buscar_alumnos_por_especialidad(self):
         """Test TDD: Buscar todos los alumnos de una especialidad con datos de facultad"""
-        from test.instancias import nuevoalumno
+        from test.instancias import nuevoalumno, bulk_nuevos_alumnos
         
         # Crear especialidad con facultad
         especialidad = nuevaespecialidad(nombre="Ingeniería Informática")
         
         # Crear varios alumnos de esa especialidad
-        alumno1 = nuevoalumno(nombre="Juan", apellido="Pérez", especialidad=especialidad)
-        alumno2 = nuevoalumno(nombre="María", apellido="González", especialidad=especialidad)
-        alumno3 = nuevoalumno(nombre="Carlos", apellido="Rodríguez", especialidad=especialidad)
+        bulk_nuevos_alumnos(especialidad, [
+            {"nombre": "Juan", "apellido": "Pérez"},
+            {"nombre": "María", "apellido": "González"},
+            {"nombre": "Carlos", "apellido": "Rodríguez"},
+        ])
         
         # Crear otro alumno de otra especialidad (no debe aparecer)
         otra_especialidad = nuevaespecialidad(nombre="Otra Especialidad")
@@ -76,40 +133,142 @@ class EspecialidadTestCase(unittest.TestCase):
         
         # Validaciones
         self.assertIsNotNone(resultado)
-        self.assertIn('especialidad', resultado)
-        self.assertIn('facultad', resultado)
-        self.assertIn('alumnos', resultado)
+        self.assertIsNotNone(resultado.especialidad)
+        self.assertIsNotNone(resultado.facultad)
+        self.assertIsNotNone(resultado.alumnos)
         
         # Validar datos de especialidad
-        self.assertEqual(resultado['especialidad']['nombre'], "Ingeniería Informática")
-        self.assertEqual(resultado['especialidad']['letra'], "A")
+        self.assertEqual(resultado.especialidad.nombre, "Ingeniería Informática")
+        self.assertEqual(resultado.especialidad.letra, "A")
         
         # Validar datos de facultad
-        self.assertEqual(resultado['facultad']['nombre'], "Facultad de Ciencias")
-        self.assertIn('universidad', resultado['facultad'])
+        self.assertEqual(resultado.facultad.nombre, "Facultad de Ciencias")
+        self.assertIsNotNone(resultado.facultad.universidad)
         
         # Validar alumnos
-        self.assertEqual(len(resultado['alumnos']), 3)
-        nombres_alumnos = [a['nombre'] for a in resultado['alumnos']]
+        self.assertEqual(len(resultado.alumnos), 3)
+        nombres_alumnos = [a.nombre for a in resultado.alumnos]
         self.assertIn("Juan", nombres_alumnos)
         self.assertIn("María", nombres_alumnos)
         self.assertIn("Carlos", nombres_alumnos)
         self.assertNotIn("Pedro", nombres_alumnos)  # No debe aparecer
         
         # Validar estructura de alumno
-        primer_alumno = resultado['alumnos'][0]
-        self.assertIn('nombre', primer_alumno)
-        self.assertIn('apellido', primer_alumno)
-        self.assertIn('nro_legajo', primer_alumno)
+        primer_alumno = resultado.alumnos[0]
+        self.assertIsNotNone(primer_alumno.nombre)
+        self.assertIsNotNone(primer_alumno.apellido)
+        self.assertIsNotNone(primer_alumno.nro_legajo)
+
+    def test_datos_facultad_copiados(self):
+        especialidad = nuevaespecialidad()
+        self.assertEqual(especialidad.facultad_nombre, "Facultad de Ciencias")
+        self.assertEqual(especialidad.universidad_sigla, "UN")
+        especialidad_id = especialidad.id
+
+        especialidad.facultad.sigla = "FX"
+        especialidad.facultad.universidad.nombre = "Universidad Renombrada"
+        db.session.flush()
+        db.session.expire_all()
+        especialidad = EspecialidadService.buscar_por_id(especialidad_id)
+        self.assertEqual(especialidad.facultad_sigla, "FX")
+        self.assertEqual(especialidad.universidad_nombre, "Universidad Renombrada")
+
+        db.session.query(Especialidad).update({Especialidad.facultad_sigla: None})
+        self.assertEqual(EspecialidadRepository.copiar_datos_facultad(), 1)
+        db.session.expire_all()
+        self.assertEqual(EspecialidadService.buscar_por_id(especialidad_id).facultad_sigla, "FX")
+
+    def test_buscar_alumnos_por_especialidad_sin_datos_facultad_copiados(self):
+        import json
+        from sqlalchemy import update
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        nuevoalumno(nombre="Ana", especialidad=especialidad)
+        # Como una fila anterior a las columnas o escrita con un UPDATE masivo
+        db.session.execute(update(Especialidad).values(
+            facultad_nombre=None, facultad_abreviatura=None, facultad_sigla=None,
+            universidad_id=None, universidad_nombre=None, universidad_sigla=None))
+
+        resultado = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual(resultado.facultad.nombre, "Facultad de Ciencias")
+        self.assertEqual(resultado.facultad.universidad.hashid, especialidad.facultad.universidad.hashid)
+        self.assertEqual([a.nombre for a in resultado.alumnos], ["Ana"])
+        with self.app.test_client() as client:
+            response = client.get(f'/api/v1/especialidad/{especialidad.hashid}/alumnos')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['facultad']['universidad']['sigla'], "UN")
+
+        resultado = self.app.test_cli_runner().invoke(args=['copiar-datos-facultad'])
+        self.assertEqual(resultado.exit_code, 0)
+        self.assertIn("Especialidades actualizadas: 1", resultado.output)
+        db.session.expire_all()
+        self.assertEqual(EspecialidadService.buscar_por_id(especialidad.id).universidad_sigla, "UN")
+
+    def test_buscar_filas_alumnos_por_especialidad(self):
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        alumno = nuevoalumno(nombre="Ana", especialidad=especialidad)
+        filas = EspecialidadRepository.buscar_filas_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual(len(filas), 1)
+        fila = filas[0]._mapping
+        self.assertEqual(fila['especialidad_id'], especialidad.id)
+        self.assertEqual(fila['universidad_sigla'], "UN")
+        self.assertEqual(fila['alumno_id'], alumno.id)
+        self.assertEqual(fila['fecha_ingreso'], "2020-01-01")
+
+    def test_buscar_alumnos_por_especialidad_sin_alumnos(self):
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        resultado = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual(resultado.alumnos, ())
+        self.assertEqual(resultado.especialidad.hashid, especialidad.hashid)
+        self.assertEqual(resultado.facultad.universidad.hashid, especialidad.facultad.universidad.hashid)
+
+        EspecialidadService.invalidar_cache_alumnos()
+        alumno = nuevoalumno(especialidad=especialidad)
+        resultado = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual(resultado.alumnos[0].hashid, alumno.hashid)
+        self.assertEqual(resultado.alumnos[0].fecha_nacimiento, "1990-01-01")
+
+    def test_buscar_alumnos_por_especialidad_cacheado(self):
+        from test.instancias import nuevoalumno
+        from app.services import AlumnoService
+        especialidad = nuevaespecialidad()
+        alumno = nuevoalumno(nombre="Ana", especialidad=especialidad)
+        primero = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertIs(EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id), primero)
+
+        nuevoalumno(nombre="Luis", especialidad=especialidad)
+        resultado = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual(len(resultado.alumnos), 2)
+
+        AlumnoService.borrar_por_id(alumno.id)
+        resultado = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual([a.nombre for a in resultado.alumnos], ["Luis"])
+
+    def test_cache_invalidada_por_eventos_orm(self):
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        nuevoalumno(nombre="Ana", especialidad=especialidad)
+        cuerpo = EspecialidadService.buscar_alumnos_por_especialidad_serializada(especialidad.id)
+        self.assertIs(EspecialidadService.buscar_alumnos_por_especialidad_serializada(especialidad.id), cuerpo)
+
+        # Cambio directo sobre el modelo, sin pasar por ningún servicio
+        especialidad.facultad.nombre = "Facultad Renombrada"
+        db.session.commit()
+        cuerpo = EspecialidadService.buscar_alumnos_por_especialidad_serializada(especialidad.id)
+        self.assertIn("Facultad Renombrada".encode(), cuerpo)
 
     def test_endpoint_buscar_alumnos_por_especialidad(self):
         """Test de integración: Endpoint REST para buscar alumnos por especialidad"""
-        from test.instancias import nuevoalumno
+        from test.instancias import bulk_nuevos_alumnos
         
         # Crear datos de prueba
         especialidad = nuevaespecialidad(nombre="Ingeniería en Sistemas")
-        alumno1 = nuevoalumno(nombre="Ana", apellido="Martínez", especialidad=especialidad)
-        alumno2 = nuevoalumno(nombre="Luis", apellido="Fernández", especialidad=especialidad)
+        bulk_nuevos_alumnos(especialidad, [
+            {"nombre": "Ana", "apellido": "Martínez"},
+            {"nombre": "Luis", "apellido": "Fernández"},
+        ])
         
         # Hacer petición al endpoint usando el hashid generado
         with self.app.test_client() as client:
@@ -132,6 +291,110 @@ class EspecialidadTestCase(unittest.TestCase):
             self.assertEqual(data['especialidad']['nombre'], "Ingeniería en Sistemas")
             self.assertEqual(len(data['alumnos']), 2)
     
+    def test_generar_alumnos_por_especialidad_json(self):
+        import json
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        for i in range(5):
+            nuevoalumno(nombre=f"Alumno {i}", especialidad=especialidad)
+        partes = EspecialidadService.generar_alumnos_por_especialidad_json(especialidad.id)
+        cuerpo = b''.join(partes)
+        data = json.loads(cuerpo)
+        self.assertEqual(len(data['alumnos']), 5)
+        self.assertEqual(data['facultad']['universidad']['sigla'], "UN")
+        # Al terminar de enviarse queda cacheada
+        self.assertEqual(list(EspecialidadService.generar_alumnos_por_especialidad_json(especialidad.id)), [cuerpo])
+        self.assertIsNone(EspecialidadService.generar_alumnos_por_especialidad_json(99999))
+
+    def test_generar_alumnos_por_especialidad_json_invalidada_durante_el_envio(self):
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        nuevoalumno(nombre="Ana", especialidad=especialidad)
+        partes = EspecialidadService.generar_alumnos_por_especialidad_json(especialidad.id)
+        next(partes)
+        # Un commit que invalida mientras se envía: el cuerpo ya es viejo
+        EspecialidadService.invalidar_cache_alumnos()
+        b''.join(partes)
+        self.assertGreater(len(list(EspecialidadService.generar_alumnos_por_especialidad_json(especialidad.id))), 1)
+
+    def test_endpoint_error_en_encabezado_antes_de_enviar(self):
+        from unittest import mock
+        especialidad = nuevaespecialidad()
+        with mock.patch('app.services.especialidad_service._encabezado', side_effect=RuntimeError("falla")):
+            with self.assertRaises(RuntimeError):
+                EspecialidadService.generar_alumnos_por_especialidad_json(especialidad.id)
+            with self.app.test_client() as client:
+                response = client.get(f'/api/v1/especialidad/{especialidad.hashid}/alumnos')
+        self.assertEqual(response.status_code, 500)
+
+    def test_endpoint_buscar_alumnos_por_especialidad_columnar(self):
+        from test.instancias import bulk_nuevos_alumnos
+        especialidad = nuevaespecialidad()
+        bulk_nuevos_alumnos(especialidad, [
+            {"nombre": "Ana", "nro_legajo": 1},
+            {"nombre": "Luis", "nro_legajo": 2},
+        ])
+        with self.app.test_client() as client:
+            url = f'/api/v1/especialidad/{especialidad.hashid}/alumnos'
+            data = client.get(url, query_string={'format': 'columnar'}).get_json()
+            filas = client.get(url).get_json()
+            self.assertEqual(client.get(url, query_string={'format': 'otro'}).status_code, 400)
+        self.assertEqual(sorted(data['alumnos']['nombre']), ["Ana", "Luis"])
+        self.assertEqual(len(data['alumnos']['hashid']), 2)
+        self.assertEqual(data['especialidad'], filas['especialidad'])
+        por_id = {a['id']: a for a in filas['alumnos']}
+        for i, id in enumerate(data['alumnos']['id']):
+            self.assertEqual(data['alumnos']['nro_legajo'][i], por_id[id]['nro_legajo'])
+            self.assertEqual(data['alumnos']['fecha_ingreso'][i], por_id[id]['fecha_ingreso'])
+
+    def test_como_dict(self):
+        from dataclasses import asdict
+        from app.mapping.especialidad_alumnos_respuesta import como_dict
+        especialidad = nuevaespecialidad()
+        resultado = EspecialidadService.buscar_alumnos_por_especialidad(especialidad.id)
+        self.assertEqual(como_dict(resultado.facultad)['universidad'], resultado.facultad.universidad)
+        self.assertEqual(como_dict(resultado.especialidad), asdict(resultado.especialidad))
+        self.assertEqual(list(como_dict(resultado)), ['especialidad', 'facultad', 'alumnos'])
+        with self.assertRaises(TypeError):
+            como_dict(object())
+
+    @unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack no está instalado")
+    def test_endpoint_buscar_alumnos_por_especialidad_msgpack(self):
+        import msgpack
+        from test.instancias import nuevoalumno
+        especialidad = nuevaespecialidad()
+        alumno = nuevoalumno(nombre="Ana", especialidad=especialidad)
+        with self.app.test_client() as client:
+            url = f'/api/v1/especialidad/{especialidad.hashid}/alumnos'
+            response = client.get(url, headers={'Accept': 'application/msgpack'})
+            json = client.get(url, query_string={'format': 'columnar'}).get_json()
+            columnar = client.get(url, query_string={'format': 'columnar'},
+                                  headers={'Accept': 'application/msgpack'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/msgpack')
+        data = msgpack.unpackb(response.data)
+        self.assertEqual(data['especialidad']['nombre'], "Matematicas")
+        self.assertEqual(data['facultad']['universidad']['sigla'], "UN")
+        self.assertEqual(data['alumnos'][0]['hashid'], alumno.hashid)
+        self.assertEqual(msgpack.unpackb(columnar.data), json)
+
+    @unittest.skipIf(MSGPACK_AVAILABLE, "msgpack está instalado")
+    def test_endpoint_buscar_alumnos_por_especialidad_msgpack_no_disponible(self):
+        especialidad = nuevaespecialidad()
+        with self.app.test_client() as client:
+            url = f'/api/v1/especialidad/{especialidad.hashid}/alumnos'
+            response = client.get(url, headers={'Accept': 'application/msgpack'})
+        self.assertEqual(response.status_code, 406)
+
+    def test_hashid_converter_cacheado(self):
+        from app.hashid_converter import HashidConverterCacheado
+        especialidad = nuevaespecialidad()
+        conversor = HashidConverterCacheado(self.app.url_map)
+        self.assertEqual(conversor.to_python(especialidad.hashid), especialidad.id)
+        self.assertEqual(conversor.to_python(especialidad.hashid), especialidad.id)
+        self.assertEqual(conversor.to_python.cache_info().hits, 1)
+        self.assertIs(self.app.url_map.converters['hashid'], HashidConverterCacheado)
+
     def test_endpoint_especialidad_no_encontrada(self):
         """Test: Endpoint retorna 404 si la especialidad no existe"""
         with self.app.test_client() as client:
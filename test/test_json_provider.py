@@ -0,0 +1,55 @@
+import unittest
+import os
+from dataclasses import dataclass
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.json_provider import OrjsonProvider, ORJSON_AVAILABLE
+
+
+@dataclass(frozen=True, slots=True)
+class Interna:
+    zeta: int
+    alfa: date
+
+
+@dataclass(frozen=True, slots=True)
+class Externa:
+    nombre: str
+    interna: Interna
+    items: tuple
+
+
+@unittest.skipUnless(ORJSON_AVAILABLE, "orjson no está instalado")
+class OrjsonProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_app_usa_orjson(self):
+        self.assertIsInstance(self.app.json, OrjsonProvider)
+
+    def test_mismo_resultado_que_flask(self):
+        datos = {"b": 1, "a": [date(2020, 1, 1), None, "texto"]}
+        esperado = DefaultJSONProvider(self.app).dumps(datos, separators=(",", ":"))
+        self.assertEqual(self.app.json.dumps(datos, separators=(",", ":")), esperado)
+
+    def test_loads(self):
+        self.assertEqual(self.app.json.loads('{"a": [1, 2]}'), {"a": [1, 2]})
+
+    def test_dataclasses_con_claves_ordenadas(self):
+        datos = Externa("x", Interna(1, date(2020, 1, 1)), (Interna(2, date(2021, 2, 2)),))
+        esperado = DefaultJSONProvider(self.app).dumps(datos, separators=(",", ":"))
+        obtenido = self.app.json.dumps(datos, separators=(",", ":"))
+        self.assertEqual(obtenido, esperado)
+        self.assertTrue(obtenido.startswith('{"interna":{"alfa":'))
+
+    def test_dataclasses_sin_ordenar_claves(self):
+        self.app.json.sort_keys = False
+        obtenido = self.app.json.dumps(Interna(1, date(2020, 1, 1)))
+        self.assertEqual(obtenido, '{"zeta":1,"alfa":"Wed, 01 Jan 2020 00:00:00 GMT"}')